@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_jobs import generate_jobs, make_job
+
+# Response shapes understood by job_scraper.extract_jobs_from_response;
+# 'rotate' cycles through all of them page by page
+RESPONSE_SHAPES = ('results', 'jobs', 'data', 'hits', 'list')
+ERROR_STATUSES = (429, 500, 502, 503, 504)
+
+# List filters the mock applies, with the values of job_scraper's default
+# search state. Every job gets one value per filter, so plan_shards() can
+# split a query on them as it does against the real API
+FILTER_VALUES = {
+    'workplaceTypes': ('Remote', 'Hybrid', 'Onsite'),
+    'commitmentTypes': ('Full Time', 'Part Time', 'Contract', 'Internship', 'Temporary', 'Seasonal',
+                        'Volunteer'),
+    'seniorityLevel': ('No Prior Experience Required', 'Entry Level', 'Mid Level'),
+    'roleTypes': ('Individual Contributor', 'People Manager'),
+}
+
+def wrap_jobs(jobs, shape):
+    """
+    Wrap a page of jobs in one of the response shapes the API has used
+
+    Args:
+        jobs (list): Job dictionaries
+        shape (str): One of RESPONSE_SHAPES
+
+    Returns:
+        dict or list: Response body
+    """
+    if shape == 'list':
+        return jobs
+    if shape == 'hits':
+        return {'hits': {'total': {'value': len(jobs)},
+                         'hits': [{'_id': job['id'], '_source': job} for job in jobs]}}
+    return {shape: jobs, 'page_size': len(jobs)}
+
+class MockHiringCafe:
+    """
+    Stand-in for the hiring.cafe search API
+
+    Serves a deterministic synthetic corpus from the count and search
+    endpoints. Pages are built once and reused, so serving them costs
+    little CPU next to the client being measured. Both endpoints honour the
+    FILTER_VALUES lists of the searchState; a job matches when its value
+    for each filter is listed (a missing or empty list matches everything).
+
+    Args:
+        total (int): Jobs in the corpus
+        latency (float): Seconds added to every jobs request (default: 0)
+        jitter (float): Extra random latency up to this many seconds (default: 0)
+        error_rate (float): Share of jobs requests answered with a 429/5xx (default: 0)
+        retry_after (float): Retry-After sent with 429 responses, or None (default: 0)
+        shape (str): Response shape, or 'rotate' (default: 'results')
+        max_page_size (int): Largest page returned whatever size is asked for
+            (default: 1000)
+        seed (int): Corpus and error-injection seed (default: 0)
+        fail_pages (iterable): Page indexes always answered with a 503, for
+            deterministic failures (default: none)
+    """
+
+    def __init__(self, total, latency=0.0, jitter=0.0, error_rate=0.0, retry_after=0,
+                 shape='results', max_page_size=1000, seed=0, fail_pages=()):
+        if shape != 'rotate' and shape not in RESPONSE_SHAPES:
+            raise ValueError(f"Unknown response shape '{shape}'")
+        self.total = total
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.shape = shape
+        self.max_page_size = max_page_size
+        self.seed = seed
+        self.fail_pages = frozenset(fail_pages)
+        self.requests = 0
+        self.errors = 0
+        self._pages = {}
+        self._matches = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def job_filter_value(self, index, name):
+        """Value of a FILTER_VALUES filter for the job at a corpus index"""
+        values = FILTER_VALUES[name]
+        return values[zlib.crc32(f'{self.seed}:{index}:{name}'.encode('utf-8')) % len(values)]
+
+    @staticmethod
+    def filter_key(search_state):
+        """
+        Normalized filters of a search state
+
+        Args:
+            search_state (dict): Search state from a request payload
+
+        Returns:
+            tuple: (name, values) pairs of the filters that exclude jobs;
+                empty when every job matches
+        """
+        key = []
+        for name, values in FILTER_VALUES.items():
+            selected = (search_state or {}).get(name)
+            if isinstance(selected, list) and selected and not set(values) <= set(selected):
+                key.append((name, frozenset(selected)))
+        return tuple(key)
+
+    def matching_indexes(self, key):
+        """Corpus indexes matching a filter_key(), or None for the whole corpus"""
+        if not key:
+            return None
+        with self._lock:
+            indexes = self._matches.get(key)
+        if indexes is None:
+            indexes = [index for index in range(self.total)
+                       if all(self.job_filter_value(index, name) in selected for name, selected in key)]
+            with self._lock:
+                self._matches[key] = indexes
+        return indexes
+
+    def count(self, search_state=None):
+        """Number of jobs matching a search state"""
+        indexes = self.matching_indexes(self.filter_key(search_state))
+        return self.total if indexes is None else len(indexes)
+
+    def page_body(self, page, size, search_state=None):
+        """Encoded response body for one page"""
+        size = min(size, self.max_page_size)
+        filters = self.filter_key(search_state)
+        key = (filters, page, size)
+        with self._lock:
+            body = self._pages.get(key)
+        if body is None:
+            start = page * size
+            indexes = self.matching_indexes(filters)
+            if indexes is None:
+                jobs = list(generate_jobs(max(min(size, self.total - start), 0), self.seed, start))
+            else:
+                jobs = [make_job(index, self.seed) for index in indexes[start:start + size]]
+            shape = RESPONSE_SHAPES[page % len(RESPONSE_SHAPES)] if self.shape == 'rotate' else self.shape
+            body = json.dumps(wrap_jobs(jobs, shape)).encode('utf-8')
+            with self._lock:
+                self._pages[key] = body
+        return body
+
+    def warm(self, size=1000):
+        """Build every page up front so serving measures only the client"""
+        size = min(size, self.max_page_size)
+        for page in range((self.total + size - 1) // size):
+            self.page_body(page, size)
+
+    def should_fail(self, page=None):
+        """Decide whether the next jobs request gets an injected error"""
+        with self._lock:
+            self.requests += 1
+            if page in self.fail_pages:
+                self.errors += 1
+                return 503
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return self._random.choice(ERROR_STATUSES)
+        return None
+
+    def serve(self, host='127.0.0.1', port=0):
+        """
+        Create a threaded HTTP server for this mock
+
+        Args:
+            host (str): Interface to bind (default: 127.0.0.1)
+            port (int): Port to bind, 0 for any free port (default: 0)
+
+        Returns:
+            ThreadingHTTPServer: Bound server; call serve_forever() to run it
+        """
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_body(self, status, body, headers=()):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                search_state = payload.get('searchState')
+                if self.path.rstrip('/').endswith('/api/search-jobs/get-total-count'):
+                    self.send_body(200, json.dumps({'total': mock.count(search_state)}).encode('utf-8'))
+                    return
+                if not self.path.rstrip('/').endswith('/api/search-jobs'):
+                    self.send_body(404, b'{"error": "not found"}')
+                    return
+
+                delay = mock.latency + (random.uniform(0, mock.jitter) if mock.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                page = int(payload.get('page', 0))
+                status = mock.should_fail(page)
+                if status is not None:
+                    headers = []
+                    if status == 429 and mock.retry_after is not None:
+                        headers.append(('Retry-After', str(mock.retry_after)))
+                    self.send_body(status, json.dumps({'error': 'injected'}).encode('utf-8'), headers)
+                    return
+                self.send_body(200, mock.page_body(page, int(payload.get('size', 1000)), search_state))
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the mock server"""
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the hiring.cafe search API")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port to bind (default: 8765)")
+    parser.add_argument('--total', type=int, default=10000, help="Jobs in the corpus (default: 10000)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to each jobs request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Share of jobs requests answered with 429/5xx (default: 0)")
+    parser.add_argument('--retry-after', type=float, default=0, help="Retry-After sent with 429s (default: 0)")
+    parser.add_argument('--shape', choices=RESPONSE_SHAPES + ('rotate',), default='results',
+                        help="Response shape, or rotate through all of them (default: results)")
+    parser.add_argument('--max-page-size', type=int, default=1000,
+                        help="Largest page returned (default: 1000)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument('--fail-pages', default='',
+                        help="Comma-separated page indexes always answered with 503 (default: none)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    mock = MockHiringCafe(args.total, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          retry_after=args.retry_after, shape=args.shape, max_page_size=args.max_page_size,
+                          seed=args.seed, fail_pages=[int(page) for page in args.fail_pages.split(',') if page])
+    mock.warm()
+    server = mock.serve(args.host, args.port)
+    host, port = server.server_address[:2]
+    # The benchmark runner reads this line to find the port
+    print(f"Serving mock hiring.cafe API on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,343 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from mock_server import RESPONSE_SHAPES
+from synthetic_jobs import make_description, write_corpus
+
+STAGES = ('scrape', 'flatten', 'convert')
+SHAPE_CHECK_JOBS = 2500  # three pages per shape
+
+# Markup html_text.extract_text() must handle exactly like BeautifulSoup:
+# entities, void and non-text tags, stray or unclosed tags, CDATA and control characters
+HTML_CHECK_CASES = (
+    '<p>Hello <b>world</b></p>', 'a &amp; b', '&notit; &copy2024 &#150; &#x41;b &#0; &#99999999; &#xZZ; &#12a',
+    '<script>var x="<b>";</script>after', '<style>p{}</style><p> x </p>', '<!-- c -->t<!DOCTYPE html><?pi?>',
+    '<![CDATA[ cdata ]]>', '<template><p>t</p></template>out', '<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>',
+    '<br>a</br>b', 'x <br/> y </br> z', '<div><rt>x</div>y', 'a < b and c > d', '<p', '<', '</', '<div>unclosed',
+    '&', '&#', '\x01<b>\x0b x \x1c</b>', '<p>\n\n  spaced   text \n</p>', '<img src=x>after<img/>',
+    '<svg><title>t</title></svg>', '<textarea><b>x</b></textarea>', '<title>a&amp;b</title>',
+    '<p class="a">Line<br>break</p>&nbsp;&nbsp;x', '<script>unterminated', '<a href="&amp;">q</a>',
+    '<scr<b>ipt>', '<p>a</P>b</p>', '<!DOCTYPE html><html><head><style>x</style></head><body>B</body></html>',
+)
+HTML_CHECK_TAGS = ('p', 'b', 'div', 'br', 'br/', 'script', 'style', 'rt', 'rp', 'template', 'span', 'img', 'li',
+                   'a href="&amp;"')
+HTML_CHECK_TEXT = (' ', 'x', ' y ', '\n', '&amp;', '&lt;', '&#65;', '&foo', '&nbsp;', 'z\x01', '<', '>', '&#x',
+                   '<!--c-->', '<![CDATA[q]]>')
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Nearest-rank percentiles of a list of values
+
+    Args:
+        values (list): Samples
+        points (tuple): Percentiles to compute (default: 50, 90, 99)
+
+    Returns:
+        dict: {'p50': ..., ...}, or None values when there are no samples
+    """
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        if not ordered:
+            result[f'p{point}'] = None
+            continue
+        rank = max(math.ceil(point / 100 * len(ordered)) - 1, 0)
+        result[f'p{point}'] = ordered[rank]
+    return result
+
+@contextlib.contextmanager
+def start_mock_server(**options):
+    """
+    Run mock_server.py in a child process on a free port
+
+    Args:
+        **options: Mock server flags, e.g. total=1000, latency=0.05
+
+    Yields:
+        str: Base URL of the running server
+    """
+    command = [sys.executable, os.path.join(BENCHMARK_DIR, 'mock_server.py'), '--port', '0']
+    for name, value in options.items():
+        command += [f"--{name.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        line = process.stdout.readline()
+        if 'http://' not in line:
+            raise RuntimeError(f"Mock server did not start: {line!r}")
+        yield line.strip().split()[-1]
+    finally:
+        process.terminate()
+        process.wait()
+
+def _case_scrape(base_url, concurrency=1):
+    # The endpoint is read from the environment when job_scraper is imported
+    os.environ['HIRING_CAFE_BASE_URL'] = base_url
+    from job_scraper import JOBS_ENDPOINT, create_session, scrape_hiring_cafe_jobs
+
+    latencies = []
+    session = create_session(pool_size=max(concurrency, 1))
+    session.hooks['response'].append(lambda response, *args, **kwargs:
+                                     latencies.append(response.elapsed.total_seconds()))
+    started = time.perf_counter()
+    jobs = scrape_hiring_cafe_jobs('benchmark', concurrency=concurrency, session=session)
+    elapsed = time.perf_counter() - started
+    return {'rows': len(jobs), 'seconds': elapsed, 'latency': percentiles(latencies),
+            'requests': len(latencies), 'retries': session.get_adapter(JOBS_ENDPOINT).retry_count}
+
+def _case_flatten(corpus):
+    from excel_converter import flatten_job_data
+    from job_io import iter_jobs_from_file
+
+    jobs = list(iter_jobs_from_file(corpus))
+    latencies = []
+    started = time.perf_counter()
+    for job in jobs:
+        job_started = time.perf_counter()
+        flatten_job_data(job)
+        latencies.append(time.perf_counter() - job_started)
+    elapsed = time.perf_counter() - started
+    return {'rows': len(jobs), 'seconds': elapsed, 'latency': percentiles(latencies)}
+
+def _case_convert(corpus, workers=1, excel_workers=1, chunk_size=10000):
+    from excel_converter import convert_json_to_excel
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        created = convert_json_to_excel(corpus, os.path.join(output_dir, 'bench'), chunk_size=chunk_size,
+                                        workers=workers, excel_workers=excel_workers)
+        elapsed = time.perf_counter() - started
+    with open(corpus, encoding='utf-8') as f:
+        rows = sum(1 for line in f if line.strip())
+    return {'rows': rows, 'seconds': elapsed, 'files': len(created), 'latency': percentiles([])}
+
+CASES = {'scrape': _case_scrape, 'flatten': _case_flatten, 'convert': _case_convert}
+
+def run_case(name, **params):
+    """
+    Run one benchmark case in a fresh interpreter
+
+    A separate process gives every case its own peak RSS and keeps caches
+    from one case from speeding up the next.
+
+    Args:
+        name (str): Stage name from CASES
+        **params: Arguments of the case function
+
+    Returns:
+        dict: Measurements, including 'rows_per_second' and 'peak_rss_mb'
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--case', name, '--params', json.dumps(params)]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def _run_case_here(name, params):
+    # The code under test prints progress; keep stdout for the result line
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        result = CASES[name](**params)
+    result['rows_per_second'] = result['rows'] / result['seconds'] if result['rows'] and result['seconds'] else None
+    result['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(result))
+
+def check_response_shapes(total=SHAPE_CHECK_JOBS):
+    """
+    Scrape every response shape from the mock server and check the job count
+
+    Args:
+        total (int): Jobs served per shape (default: SHAPE_CHECK_JOBS)
+
+    Returns:
+        dict: Shape name -> number of jobs scraped
+    """
+    found = {}
+    for shape in RESPONSE_SHAPES + ('rotate',):
+        with start_mock_server(total=total, shape=shape) as base_url:
+            found[shape] = run_case('scrape', base_url=base_url)['rows']
+    return found
+
+def random_markup(rng):
+    """Random fragment of text, entities and (often mismatched) open and close tags"""
+    parts = []
+    for _ in range(rng.randint(1, 12)):
+        r = rng.random()
+        if r < 0.3:
+            parts.append(rng.choice(HTML_CHECK_TEXT))
+        elif r < 0.65:
+            parts.append(f'<{rng.choice(HTML_CHECK_TAGS)}>')
+        else:
+            parts.append(f'</{rng.choice(HTML_CHECK_TAGS).split()[0].rstrip("/")}>')
+    return ''.join(parts)
+
+def check_html_text(samples=20000, seed=0):
+    """
+    Compare html_text.extract_text() with BeautifulSoup's get_text(strip=True)
+
+    Both the glued text of the Excel export and the space-separated text of
+    the search index (separator=' ') are compared.
+
+    html_text reproduces BeautifulSoup's html.parser builder using some of
+    its private helpers, so this is the check to run after upgrading bs4.
+    The markup is HTML_CHECK_CASES, synthetic job descriptions and random
+    fragments, all reproducible from the seed.
+
+    Args:
+        samples (int): Synthetic descriptions and random fragments, each (default: 20000)
+        seed (int): Random seed (default: 0)
+
+    Returns:
+        tuple: (number of inputs checked, list of (markup, expected, actual) mismatches)
+    """
+    from bs4 import BeautifulSoup
+    from html_text import extract_text
+
+    rng = random.Random(seed)
+    cases = list(HTML_CHECK_CASES)
+    cases.extend(make_description(rng) for _ in range(samples))
+    cases.extend(random_markup(rng) for _ in range(samples))
+
+    mismatches = []
+    for markup in cases:
+        soup = BeautifulSoup(markup, 'html.parser')
+        for separator in ('', ' '):
+            expected = soup.get_text(separator, strip=True)
+            actual = extract_text(markup, separator)
+            if actual != expected:
+                mismatches.append((markup, expected, actual))
+    return len(cases), mismatches
+
+def _format(value, pattern):
+    return pattern.format(value) if value is not None else '-'
+
+def print_report(results):
+    """Print benchmark results as a table"""
+    print(f"{'stage':<8} {'jobs':>8} {'seconds':>9} {'rows/s':>10} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'peak MB':>8} {'retries':>7}")
+    for result in results:
+        latency = result['latency']
+        print(f"{result['stage']:<8} {result['size']:>8} {result['seconds']:>9.2f} "
+              f"{_format(result['rows_per_second'], '{:,.0f}'):>10} "
+              f"{_format(latency['p50'] and latency['p50'] * 1000, '{:.2f}'):>8} "
+              f"{_format(latency['p90'] and latency['p90'] * 1000, '{:.2f}'):>8} "
+              f"{_format(latency['p99'] and latency['p99'] * 1000, '{:.2f}'):>8} "
+              f"{result['peak_rss_mb']:>8.1f} {_format(result.get('retries'), '{}'):>7}")
+
+def run_benchmarks(sizes, stages=STAGES, concurrency=4, latency=0.05, error_rate=0.0, shape='results',
+                   workers=1, excel_workers=1, seed=0):
+    """
+    Benchmark the scraper and converter across corpus sizes
+
+    Args:
+        sizes (list): Corpus sizes (number of jobs)
+        stages (tuple): Stages to run, from 'scrape', 'flatten' and 'convert'
+        concurrency (int): Pages fetched in parallel when scraping (default: 4)
+        latency (float): Mock server latency per page in seconds (default: 0.05)
+        error_rate (float): Share of page requests answered with 429/5xx (default: 0)
+        shape (str): Mock response shape (default: 'results')
+        workers (int): Flattening processes for the converter (default: 1)
+        excel_workers (int): Excel writing processes for the converter (default: 1)
+        seed (int): Corpus seed (default: 0)
+
+    Returns:
+        list: One result dictionary per (stage, size)
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        for size in sizes:
+            corpus = os.path.join(corpus_dir, f'corpus_{size}.ndjson')
+            if 'flatten' in stages or 'convert' in stages:
+                write_corpus(corpus, size, seed)
+
+            for stage in stages:
+                print(f"Running {stage} with {size:,} jobs...", file=sys.stderr)
+                if stage == 'scrape':
+                    with start_mock_server(total=size, latency=latency, error_rate=error_rate,
+                                           shape=shape, seed=seed) as base_url:
+                        result = run_case('scrape', base_url=base_url, concurrency=concurrency)
+                elif stage == 'flatten':
+                    result = run_case('flatten', corpus=corpus)
+                else:
+                    result = run_case('convert', corpus=corpus, workers=workers, excel_workers=excel_workers)
+                result.update(stage=stage, size=size)
+                results.append(result)
+    return results
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the benchmark runner"""
+    parser = argparse.ArgumentParser(description="Benchmark the scraper and converter against a local mock API")
+    parser.add_argument('--sizes', default='1000,10000',
+                        help="Comma-separated corpus sizes (default: 1000,10000)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help="Comma-separated stages to run (default: scrape,flatten,convert)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Scraper page concurrency (default: 4)")
+    parser.add_argument('--latency', type=float, default=0.05, help="Mock latency per page in seconds (default: 0.05)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Share of page requests answered with 429/5xx (default: 0)")
+    parser.add_argument('--shape', choices=RESPONSE_SHAPES + ('rotate',), default='results',
+                        help="Mock response shape (default: results)")
+    parser.add_argument('--workers', type=int, default=1, help="Converter flattening processes (default: 1)")
+    parser.add_argument('--excel-workers', type=int, default=1, help="Converter Excel writing processes (default: 1)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument('--check-shapes', action='store_true',
+                        help="Only check that every response shape is scraped completely")
+    parser.add_argument('--check-html', action='store_true',
+                        help="Only check that the fast HTML text extractor matches BeautifulSoup")
+    parser.add_argument('-o', '--output', help="Also write the results as JSON to this file")
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--params', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.case:
+        # Child process started by run_case()
+        _run_case_here(args.case, json.loads(args.params))
+        raise SystemExit(0)
+
+    if args.check_shapes:
+        found = check_response_shapes(SHAPE_CHECK_JOBS)
+        for shape, rows in found.items():
+            print(f"{shape:<8} {rows} jobs{'' if rows == SHAPE_CHECK_JOBS else f' (expected {SHAPE_CHECK_JOBS})'}")
+        raise SystemExit(0 if all(rows == SHAPE_CHECK_JOBS for rows in found.values()) else 1)
+
+    if args.check_html:
+        checked, mismatches = check_html_text(seed=args.seed)
+        for markup, expected, actual in mismatches[:10]:
+            print(f"{markup!r}: expected {expected!r}, got {actual!r}")
+        print(f"{len(mismatches)} mismatch(es) in {checked} inputs")
+        raise SystemExit(1 if mismatches else 0)
+
+    stages = tuple(stage.strip() for stage in args.stages.split(',') if stage.strip())
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print(f"Unknown stage(s): {', '.join(unknown)}")
+        raise SystemExit(2)
+
+    results = run_benchmarks([int(size) for size in args.sizes.split(',')], stages=stages,
+                             concurrency=args.concurrency, latency=args.latency, error_rate=args.error_rate,
+                             shape=args.shape, workers=args.workers, excel_workers=args.excel_workers,
+                             seed=args.seed)
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
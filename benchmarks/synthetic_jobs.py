@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_io import is_ndjson_filename, write_jobs_ndjson
+
+COMPANIES = ['acme', 'globex', 'initech', 'umbrella', 'hooli', 'stark', 'wayne', 'wonka',
+             'tyrell', 'cyberdyne', 'soylent', 'aperture', 'vandelay', 'dunder', 'pied-piper']
+SOURCES = ['greenhouse', 'lever', 'workday', 'ashby', 'smartrecruiters', 'icims', 'bamboohr']
+ROLES = ['Data Scientist', 'Software Engineer', 'Product Manager', 'Data Engineer',
+         'Machine Learning Engineer', 'Designer', 'Analyst', 'Site Reliability Engineer']
+LEVELS = ['Junior', 'Senior', 'Staff', 'Principal', 'Lead', '']
+# Longest interaction list generated (the heavy tail is cut off here)
+MAX_INTERACTIONS = 20000
+WORDS = ('we are looking for an experienced engineer to join our team and help build reliable '
+         'scalable systems with python sql cloud infrastructure data pipelines distributed services '
+         'collaborate closely with product design and research stakeholders to deliver impact').split()
+
+def _sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(words // 2, words * 2)))
+    return text.capitalize() + '.'
+
+def make_description(rng):
+    """
+    Build an HTML job description like the ones job boards return
+
+    Mixes paragraphs, headings, bullet lists, inline markup, entities,
+    line breaks and the occasional script or style block.
+
+    Args:
+        rng (random.Random): Random source
+
+    Returns:
+        str: HTML fragment
+    """
+    parts = [f'<h2>About the role</h2><p>{_sentence(rng)} {_sentence(rng)}</p>']
+    for _ in range(rng.randint(1, 4)):
+        items = ''.join(f'<li>{_sentence(rng, 8)}</li>' for _ in range(rng.randint(3, 8)))
+        parts.append(f'<h3>{rng.choice(["Responsibilities", "Requirements", "Nice to have"])}</h3><ul>{items}</ul>')
+    parts.append(f'<p><strong>Benefits</strong> &amp; perks:<br>{_sentence(rng)}<br/>'
+                 f'Salary: &#36;{rng.randint(60, 250)}k &ndash; &#x24;{rng.randint(251, 400)}k</p>')
+    if rng.random() < 0.05:
+        parts.append('<script>window.tracking = {"job": true};</script>')
+    if rng.random() < 0.05:
+        parts.append('<style>.apply { color: #333; }</style>')
+    if rng.random() < 0.02:
+        parts.append('<p>Contact\x0b us\x1f today</p>')
+    return ''.join(parts)
+
+def make_interactions(rng, popularity):
+    """
+    Build a list of user ids; popular jobs get long, heavy-tailed lists
+
+    Args:
+        rng (random.Random): Random source
+        popularity (float): Scale of the list length
+
+    Returns:
+        list: User ids
+    """
+    length = int(rng.paretovariate(1.5) * popularity) - int(popularity)
+    return rng.sample(range(1, 10_000_000), min(max(length, 0), MAX_INTERACTIONS))
+
+def make_job(index, seed=0):
+    """
+    Build one synthetic job in the shape returned by the search API
+
+    Jobs are deterministic for a given (index, seed), so a mock server and
+    a benchmark can generate the same corpus independently.
+
+    Args:
+        index (int): Position of the job in the corpus
+        seed (int): Corpus seed (default: 0)
+
+    Returns:
+        dict: Job dictionary
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    company = rng.choice(COMPANIES)
+    source = rng.choice(SOURCES)
+    title = f'{rng.choice(LEVELS)} {rng.choice(ROLES)}'.strip()
+    if rng.random() < 0.1:
+        title = f'<b>{title}</b>'
+    return {
+        'id': f'{source}-{company}-{seed}-{index}',
+        'board_token': company,
+        'source': source,
+        'apply_url': f'https://jobs.example.com/{company}/{index}',
+        'source_and_board_token': f'{source}__{company}',
+        'job_information': {
+            'title': title,
+            'description': make_description(rng),
+            'viewedByUsers': make_interactions(rng, 40),
+            'appliedFromUsers': make_interactions(rng, 5),
+            'savedFromUsers': make_interactions(rng, 8),
+            'hiddenFromUsers': make_interactions(rng, 2),
+        },
+    }
+
+def generate_jobs(count, seed=0, start=0):
+    """
+    Yield synthetic jobs
+
+    Args:
+        count (int): Number of jobs
+        seed (int): Corpus seed (default: 0)
+        start (int): Index of the first job (default: 0)
+
+    Yields:
+        dict: Job dictionaries
+    """
+    for index in range(start, start + count):
+        yield make_job(index, seed)
+
+def write_corpus(filename, count, seed=0):
+    """
+    Write a synthetic corpus as a JSON array or NDJSON (by extension)
+
+    Args:
+        filename (str): Output file; .ndjson/.jsonl (optionally .gz/.zst)
+            writes one job per line
+        count (int): Number of jobs
+        seed (int): Corpus seed (default: 0)
+
+    Returns:
+        int: Number of jobs written
+    """
+    if is_ndjson_filename(filename):
+        return write_jobs_ndjson(generate_jobs(count, seed), filename)
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(list(generate_jobs(count, seed)), f, ensure_ascii=False)
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic hiring.cafe job corpus")
+    parser.add_argument('output', help="Output file (.json, or .ndjson/.jsonl optionally .gz/.zst)")
+    parser.add_argument('--count', type=int, default=10000, help="Number of jobs (default: 10000)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed (default: 0)")
+    args = parser.parse_args()
+    written = write_corpus(args.output, args.count, args.seed)
+    print(f"Wrote {written} synthetic jobs to {args.output}")
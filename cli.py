@@ -0,0 +1,116 @@
+import argparse
+import sys
+
+# Only the standard library is imported here; each command imports what it
+# needs (requests for scraping, openpyxl and BeautifulSoup for converting)
+# when it runs. The top-level --help and the 'both' options are parsed before
+# any of that; 'scrape' and 'convert' reuse the parsers of job_scraper.py and
+# excel_converter.py, so their --help imports that module first
+
+COMMANDS = {
+    'scrape': "Scrape jobs to JSON/NDJSON (same options as job_scraper.py)",
+    'convert': "Convert a job file to Excel (same options as excel_converter.py)",
+    'both': "Scrape jobs and convert them to Excel in one process, without an intermediate file",
+}
+
+def parse_both_args(argv=None):
+    """Parse command-line arguments for the scrape-and-convert pipeline"""
+    parser = argparse.ArgumentParser(prog='cli.py both', description=COMMANDS['both'])
+    parser.add_argument('query', help="Search term")
+    parser.add_argument('--output-prefix', help="Prefix for the Excel files (default: from the search term)")
+    parser.add_argument('--concurrency', type=int, default=1, help="Pages fetched in parallel (default: 1)")
+    parser.add_argument('--rate', type=float, help="Maximum requests per second (default: unlimited)")
+    parser.add_argument('--retries', type=int, default=3,
+                        help="Retries per request on 429/5xx and connection errors (default: 3)")
+    parser.add_argument('--cache-dir', help="Cache API responses in this directory")
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help="Seconds a cached response is reused without revalidation (default: 3600)")
+    parser.add_argument('--interactions', choices=('keep', 'count', 'ids'), default='count',
+                        help="Interaction lists are reduced to counts while scraping, since the Excel "
+                             "files only hold counts (default: count)")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Maximum rows per Excel file (default: 10000)")
+    parser.add_argument('--workers', type=int, default=1, help="Processes used to flatten jobs (default: 1)")
+    parser.add_argument('--excel-workers', type=int, default=1,
+                        help="Processes used to write Excel files in parallel (default: 1)")
+    parser.add_argument('--approximate-summary', action='store_true',
+                        help="Estimate unique sources and top companies in fixed memory")
+    return parser.parse_args(argv)
+
+def run_both(argv=None):
+    """
+    Scrape a query and convert the jobs to Excel as the pages arrive
+
+    Jobs go straight from the scraper's page iterator into
+    convert_jobs_to_excel(), so they are never written to or parsed back
+    from a JSON file, and memory stays at a few pages plus one Excel part.
+    If a request fails for good, the jobs scraped so far are still
+    converted, but the run counts as failed.
+
+    Args:
+        argv (list): Arguments (default: sys.argv[2:])
+
+    Returns:
+        int: Exit status; 1 if nothing was converted or pages are missing
+    """
+    args = parse_both_args(argv)
+
+    import requests
+
+    from excel_converter import convert_jobs_to_excel
+    from job_projection import JobProjection
+    from job_scraper import create_session, iter_hiring_cafe_jobs, warn_failed_pages
+    from response_cache import ResponseCache
+
+    cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl) if args.cache_dir else None
+    projection = JobProjection(interactions=args.interactions) if args.interactions != 'keep' else None
+    session = create_session(pool_size=max(args.concurrency, 1), cache=cache, requests_per_second=args.rate,
+                             retries=args.retries, projection=projection)
+    output_prefix = args.output_prefix or args.query.lower().replace(' ', '_')
+    failed_pages = []
+
+    def scraped_jobs():
+        try:
+            yield from iter_hiring_cafe_jobs(args.query, concurrency=args.concurrency, session=session,
+                                             failed_pages=failed_pages)
+        except requests.exceptions.RequestException as e:
+            print(f"Request error: {e}; converting the jobs scraped so far")
+            failed_pages.append(None)
+
+    try:
+        created_files = convert_jobs_to_excel(scraped_jobs(), output_prefix, chunk_size=args.chunk_size,
+                                              workers=args.workers, excel_workers=args.excel_workers,
+                                              approximate_summary=args.approximate_summary)
+    finally:
+        session.close()
+
+    if failed_pages:
+        warn_failed_pages(failed_pages)
+    if created_files:
+        print(f"\nScraped and converted '{args.query}' into {len(created_files)} file(s)")
+    else:
+        print("\nNo jobs were converted")
+    return 0 if created_files and not failed_pages else 1
+
+def main(argv=None):
+    """Dispatch to the scrape, convert or both command"""
+    parser = argparse.ArgumentParser(
+        description="Scrape hiring.cafe jobs and convert them to Excel",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<9} {help_text}" for name, help_text in COMMANDS.items())
+               + "\n\nRun 'cli.py <command> --help' for the options of a command.")
+    parser.add_argument('command', choices=list(COMMANDS), help="Command to run")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Options of the command")
+    args = parser.parse_args(argv)
+
+    if args.command == 'scrape':
+        from job_scraper import main as scrape_main
+        scrape_main(args.args, interactive=False)
+    elif args.command == 'convert':
+        from excel_converter import main as convert_main
+        convert_main(args.args, interactive=False)
+    else:
+        raise SystemExit(run_both(args.args))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
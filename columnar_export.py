@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+from urllib.parse import quote
+
+from excel_converter import default_output_prefix, iter_flattened_jobs
+from job_io import iter_jobs_from_file
+
+# Partition directory used for jobs without a source (same name Hive uses)
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+COUNT_COLUMNS = ['viewed_count', 'applied_count', 'saved_count', 'hidden_count']
+
+def _import_pyarrow():
+    """Import pyarrow lazily so the Excel path does not depend on it"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow export requires the 'pyarrow' package (pip install pyarrow)")
+    return pyarrow
+
+def job_schema(pa, include_change_type=False, include_source=True):
+    """
+    Arrow schema for the rows produced by flatten_job_data()
+
+    Interaction counts are int32 and the low-cardinality columns (source,
+    board token) are dictionary encoded.
+
+    Args:
+        pa (module): The pyarrow module
+        include_change_type (bool): Add the change_type column of delta files
+        include_source (bool): Keep the source column (dropped when the
+            output is partitioned by source)
+
+    Returns:
+        pyarrow.Schema: Schema of the exported table
+    """
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        pa.field('id', pa.string()),
+        pa.field('board_token', dictionary),
+        pa.field('source', dictionary),
+        pa.field('apply_url', pa.string()),
+        pa.field('source_and_board_token', dictionary),
+        pa.field('title', pa.string()),
+        pa.field('description_clean', pa.string()),
+        pa.field('description_raw', pa.string()),
+    ]
+    fields += [pa.field(name, pa.int32()) for name in COUNT_COLUMNS]
+    if include_change_type:
+        fields.append(pa.field('change_type', dictionary))
+    if not include_source:
+        fields = [field for field in fields if field.name != 'source']
+    return pa.schema(fields)
+
+def _to_text(value):
+    """Convert a flattened value to a string column value"""
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+class _BatchWriter:
+    """
+    Writes flattened rows as record batches to one Parquet or Arrow IPC file
+
+    Dictionary columns share one growing dictionary per file, so each batch's
+    dictionary extends the previous one. Arrow IPC files can then store it
+    as dictionary deltas, which they require instead of replacements.
+    """
+
+    def __init__(self, pa, path, schema, output_format):
+        self.pa = pa
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        self.dictionaries = {field.name: {} for field in schema if pa.types.is_dictionary(field.type)}
+        if output_format == 'parquet':
+            self.writer = pa.parquet.ParquetWriter(path, schema)
+        else:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self.writer = pa.ipc.new_file(path, schema, options=options)
+
+    def _column(self, field, values):
+        pa = self.pa
+        if pa.types.is_integer(field.type):
+            return pa.array(values, type=field.type)
+        if pa.types.is_dictionary(field.type):
+            dictionary = self.dictionaries[field.name]
+            indices = []
+            for value in values:
+                value = _to_text(value)
+                if value is None:
+                    indices.append(None)
+                else:
+                    indices.append(dictionary.setdefault(value, len(dictionary)))
+            return pa.DictionaryArray.from_arrays(pa.array(indices, type=field.type.index_type),
+                                                  pa.array(list(dictionary), type=field.type.value_type))
+        return pa.array([_to_text(value) for value in values], type=field.type)
+
+    def write(self, rows):
+        """Write rows as one row group / record batch"""
+        arrays = [self._column(field, [row.get(field.name) for row in rows]) for field in self.schema]
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self.writer.close()
+
+def convert_json_to_columnar(json_file, output_path, output_format='parquet', row_group_size=10000,
+                             partition_by_source=False, workers=1, include_change_type=None):
+    """
+    Convert JSON job data to a Parquet or Arrow IPC file
+
+    Jobs are streamed from the input and written in row groups of
+    row_group_size rows, so memory scales with the row group size. With
+    partition_by_source the output is a directory with one
+    'source=<value>/part-0.<ext>' file per source (Hive layout), which
+    pyarrow.dataset, DuckDB and Spark can read as a single table.
+
+    The schema is fixed when the first row group is written. Unless
+    include_change_type says otherwise, it gets a change_type column if any
+    row of that first row group has one, as every row of a delta file does.
+
+    Args:
+        json_file (str): Path to input JSON or NDJSON file
+        output_path (str): Output file, or directory when partitioning
+        output_format (str): 'parquet' or 'arrow' (default: 'parquet')
+        row_group_size (int): Rows per row group / record batch (default: 10000)
+        partition_by_source (bool): Write one file per source (default: False)
+        workers (int): Processes used to flatten jobs (default: 1)
+        include_change_type (bool): Always (True) or never (False) write the
+            change_type column (default: None, detected from the first row group)
+
+    Returns:
+        list: List of created file names
+    """
+    if output_format not in ('parquet', 'arrow'):
+        raise ValueError(f"Unknown output format '{output_format}', expected 'parquet' or 'arrow'")
+
+    pa = _import_pyarrow()
+    extension = 'parquet' if output_format == 'parquet' else 'arrow'
+    print(f"Converting {json_file} to {output_format} format...")
+
+    writers = {}
+    buffers = {}
+    schema = None
+    dropped_change_type = False
+    jobs_read = 0
+    total_rows = 0
+
+    def flush(key):
+        nonlocal schema
+        if schema is None:
+            has_change_type = include_change_type
+            if has_change_type is None:
+                has_change_type = any('change_type' in row for rows in buffers.values() for row in rows)
+            schema = job_schema(pa, include_change_type=has_change_type, include_source=not partition_by_source)
+        rows = buffers.pop(key)
+        if key not in writers:
+            if partition_by_source:
+                partition = quote(key, safe='') if key else DEFAULT_PARTITION
+                directory = os.path.join(output_path, f'source={partition}')
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f'part-0.{extension}')
+            else:
+                path = output_path
+            writers[key] = _BatchWriter(pa, path, schema, output_format)
+        writers[key].write(rows)
+
+    try:
+        jobs = iter_jobs_from_file(json_file)
+        for flattened in iter_flattened_jobs(jobs, workers=workers):
+            jobs_read += 1
+            if flattened is None:
+                continue
+
+            if (not dropped_change_type and 'change_type' in flattened and schema is not None
+                    and 'change_type' not in schema.names):
+                print("Warning: change_type appears after the first row group and is not written; "
+                      "use --change-type to keep it")
+                dropped_change_type = True
+
+            key = (_to_text(flattened['source']) or '') if partition_by_source else None
+            buffers.setdefault(key, []).append(flattened)
+            total_rows += 1
+            if len(buffers[key]) >= row_group_size:
+                flush(key)
+
+        print(f"Loaded {jobs_read} jobs from JSON")
+        if not total_rows:
+            print("No jobs could be processed")
+            return []
+
+        for key in list(buffers):
+            flush(key)
+    except FileNotFoundError:
+        print(f"Error: JSON file '{json_file}' not found")
+        return []
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON format in '{json_file}'")
+        return []
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    created_files = [writer.path for writer in writers.values()]
+    print(f"\nSuccessfully wrote {total_rows:,} jobs to {len(created_files)} {output_format} file(s)")
+    for file in created_files[:20]:
+        print(f"  - {file}")
+    if len(created_files) > 20:
+        print(f"  ... and {len(created_files) - 20} more")
+    return created_files
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the columnar exporter"""
+    parser = argparse.ArgumentParser(description="Convert scraped jobs to Parquet or Arrow IPC")
+    parser.add_argument('json_file', help="JSON/NDJSON job file")
+    parser.add_argument('-o', '--output', help="Output file, or directory with --partition-by-source "
+                                               "(default: from the input name)")
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet',
+                        help="Output format (default: parquet)")
+    parser.add_argument('--row-group-size', type=int, default=10000,
+                        help="Rows per row group (default: 10000)")
+    parser.add_argument('--partition-by-source', action='store_true',
+                        help="Write one file per source in a Hive-style directory")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to flatten jobs (default: 1)")
+    parser.add_argument('--change-type', action='store_true', default=None,
+                        help="Always write the change_type column of delta files "
+                             "(default: when the first row group has it)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    extension = 'parquet' if args.format == 'parquet' else 'arrow'
+    output = args.output or default_output_prefix(args.json_file) + ('' if args.partition_by_source
+                                                                    else f'.{extension}')
+
+    created_files = convert_json_to_columnar(args.json_file, output, output_format=args.format,
+                                             row_group_size=args.row_group_size,
+                                             partition_by_source=args.partition_by_source,
+                                             workers=args.workers, include_change_type=args.change_type)
+    if not created_files:
+        print("\nConversion failed!")
+        raise SystemExit(1)
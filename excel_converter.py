@@ -1,14 +1,51 @@
 import json
-import pandas as pd
-from bs4 import BeautifulSoup
 import re
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
-def clean_html_text(html_text):
+# openpyxl and BeautifulSoup (via html_text) are imported where they are
+# used, so importing this module for its helpers stays cheap
+from job_io import iter_jobs_from_file, strip_compression_extension
+from job_projection import interaction_count
+from job_summary import JobSummary
+from metrics import RunMetrics, timed, timed_iter, write_run_metrics
+from parallel import iter_batch_results
+
+# Characters Excel refuses to store, removed in a single translate() pass
+ILLEGAL_CHARS_TABLE = dict.fromkeys(
+    [0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x0b, 0x0c, 0x0e, 0x0f,
+     0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1a, 0x1b, 0x1c,
+     0x1d, 0x1e, 0x1f]
+)
+
+@lru_cache(maxsize=1024)
+def _clean_html_string(html_text, separator=''):
+    """Clean a non-empty string; cached so repeated descriptions are parsed once"""
+    # Only process if it looks like HTML content, not filename
+    if len(html_text) > 100 or '<' in html_text:
+        from html_text import extract_text
+        text = extract_text(html_text, separator)
+    else:
+        text = html_text
+    
+    # Remove illegal characters for Excel
+    return text.translate(ILLEGAL_CHARS_TABLE)
+
+def clean_html_text(html_text, separator=''):
     """
     Clean HTML tags from text and return plain text
     
+    Output matches BeautifulSoup(html_text, 'html.parser').get_text(separator,
+    strip=True) but uses the streaming extractor in html_text and memoizes
+    results.
+    
     Args:
         html_text (str): HTML content to clean
+        separator (str): Put between text nodes (default: '', as in the
+            Excel export)
         
     Returns:
         str: Clean text without HTML tags and illegal characters
@@ -16,29 +53,27 @@ def clean_html_text(html_text):
     if not html_text:
         return ""
     
-    # Only process if it looks like HTML content, not filename
-    if len(html_text) > 100 or '<' in html_text:
-        soup = BeautifulSoup(html_text, 'html.parser')
-        text = soup.get_text(strip=True)
-    else:
-        text = str(html_text)
+    if not isinstance(html_text, str):
+        # Unusual values keep the original uncached BeautifulSoup path
+        if len(html_text) > 100 or '<' in html_text:
+            from bs4 import BeautifulSoup
+            text = BeautifulSoup(html_text, 'html.parser').get_text(separator, strip=True)
+        else:
+            text = str(html_text)
+        return text.translate(ILLEGAL_CHARS_TABLE)
     
-    # Remove illegal characters for Excel
-    illegal_chars = ['\x00', '\x01', '\x02', '\x03', '\x04', '\x05', '\x06', '\x07', 
-                    '\x08', '\x0b', '\x0c', '\x0e', '\x0f', '\x10', '\x11', '\x12', 
-                    '\x13', '\x14', '\x15', '\x16', '\x17', '\x18', '\x19', '\x1a', 
-                    '\x1b', '\x1c', '\x1d', '\x1e', '\x1f']
-    for char in illegal_chars:
-        text = text.replace(char, '')
-    
-    return text
+    return _clean_html_string(html_text, separator)
 
-def flatten_job_data(job):
+def flatten_job_data(job, timings=None, separator=''):
     """
     Flatten nested job data structure for Excel export
     
     Args:
         job (dict): Job data dictionary
+        timings (dict): If given, seconds spent cleaning HTML are added to
+            its 'html_clean' entry
+        separator (str): Put between the text nodes of cleaned HTML
+            (default: '', as in the Excel export)
         
     Returns:
         dict: Flattened job data
@@ -53,168 +88,415 @@ def flatten_job_data(job):
     
     # Extract job information
     job_info = job.get('job_information', {})
-    flattened['title'] = clean_html_text(str(job_info.get('title', '')))
-    flattened['description_clean'] = clean_html_text(job_info.get('description', ''))
-    flattened['description_raw'] = clean_html_text(str(job_info.get('description', '')))
+    clean_started = time.perf_counter()
+    flattened['title'] = clean_html_text(str(job_info.get('title', '')), separator)
+    flattened['description_clean'] = clean_html_text(job_info.get('description', ''), separator)
+    flattened['description_raw'] = clean_html_text(str(job_info.get('description', '')), separator)
+    if timings is not None:
+        timings['html_clean'] = timings.get('html_clean', 0.0) + time.perf_counter() - clean_started
+    
+    # Count user interactions (lists, or counts when projected at scrape time)
+    flattened['viewed_count'] = interaction_count(job_info.get('viewedByUsers', []))
+    flattened['applied_count'] = interaction_count(job_info.get('appliedFromUsers', []))
+    flattened['saved_count'] = interaction_count(job_info.get('savedFromUsers', []))
+    flattened['hidden_count'] = interaction_count(job_info.get('hiddenFromUsers', []))
     
-    # Count user interactions
-    flattened['viewed_count'] = len(job_info.get('viewedByUsers', []))
-    flattened['applied_count'] = len(job_info.get('appliedFromUsers', []))
-    flattened['saved_count'] = len(job_info.get('savedFromUsers', []))
-    flattened['hidden_count'] = len(job_info.get('hiddenFromUsers', []))
+    # Delta files from incremental scraping say what happened to each job
+    if 'change_type' in job:
+        flattened['change_type'] = job['change_type']
     
     return flattened
 
-def convert_json_to_excel(json_file, output_prefix="jobs", chunk_size=10000):
+def _flatten_batch(jobs, separator=''):
+    """
+    Flatten a batch of jobs, collecting per-job errors instead of raising
+    
+    Module level so it can run in worker processes.
+    
+    Args:
+        jobs (list): Job dictionaries
+        separator (str): Passed to flatten_job_data() (default: '')
+    
+    Returns:
+        tuple: (results, timings) where results is a list of
+            (flattened, error_message) pairs in input order (one of the two
+            is None) and timings holds the seconds spent in 'flatten' and
+            'html_clean'
+    """
+    results = []
+    timings = {'html_clean': 0.0}
+    started = time.perf_counter()
+    for job in jobs:
+        try:
+            results.append((flatten_job_data(job, timings, separator), None))
+        except Exception as e:
+            results.append((None, f"Error processing job {job.get('id', 'unknown')}: {e}"))
+    timings['flatten'] = time.perf_counter() - started
+    return results, timings
+
+def _record_flatten_timings(metrics, timings, jobs):
+    if metrics is not None:
+        metrics.add_time('flatten', timings['flatten'], calls=jobs)
+        metrics.add_time('html_clean', timings['html_clean'], calls=jobs)
+
+def iter_flattened_jobs(jobs, workers=1, batch_size=500, metrics=None, separator=''):
+    """
+    Flatten jobs in input order, optionally across worker processes
+    
+    With workers > 1 the jobs are split into batches that are flattened on a
+    process pool by iter_batch_results(). Results and error messages still
+    come back in input order, and only a few batches per worker are in
+    flight at a time.
+    
+    Args:
+        jobs (iterable): Job dictionaries
+        workers (int): Number of worker processes (default: 1, no pool)
+        batch_size (int): Jobs sent to a worker at a time (default: 500)
+        metrics (RunMetrics): Records 'flatten' and 'html_clean' time (optional)
+        separator (str): Put between the text nodes of cleaned HTML
+            (default: '', as in the Excel export)
+    
+    Yields:
+        dict: Flattened job, or None for a job that failed (the error is
+            printed as 'Error processing job ...')
+    """
+    if workers <= 1:
+        for job in jobs:
+            results, timings = _flatten_batch([job], separator)
+            _record_flatten_timings(metrics, timings, 1)
+            for flattened, error in results:
+                if error:
+                    print(error)
+                yield flattened
+        return
+    
+    for results, timings in iter_batch_results(_flatten_batch, jobs, workers, batch_size, separator):
+        _record_flatten_timings(metrics, timings, len(results))
+        for flattened, error in results:
+            if error:
+                print(error)
+            yield flattened
+
+@lru_cache(maxsize=None)
+def _header_style():
+    """Bold, bordered header style as written by pandas.DataFrame.to_excel before pandas 3.0"""
+    from openpyxl.styles import Alignment, Border, Font, Side
+    
+    side = Side(style='thin')
+    return (Font(bold=True), Border(left=side, right=side, top=side, bottom=side),
+            Alignment(horizontal='center', vertical='top'))
+
+def _header_row(worksheet, names):
+    """Build a row of styled header cells for a write-only worksheet"""
+    from openpyxl.cell import WriteOnlyCell
+    
+    font, border, alignment = _header_style()
+    cells = []
+    for name in names:
+        cell = WriteOnlyCell(worksheet, value=name)
+        cell.font = font
+        cell.border = border
+        cell.alignment = alignment
+        cells.append(cell)
+    return cells
+
+def _append_sheet(workbook, title, header, rows):
+    """Add a sheet with a styled header row to a write-only workbook"""
+    worksheet = workbook.create_sheet(title)
+    worksheet.append(_header_row(worksheet, header))
+    for row in rows:
+        worksheet.append(row)
+    return worksheet
+
+class ExcelPartWriter:
+    """
+    Streams flattened jobs into one '_part_N.xlsx' file
+    
+    Uses openpyxl's write-only mode, so rows go straight to disk instead of
+    being kept as cell objects.
+    
+    Args:
+        filename (str): Output Excel filename
+        part_number (int): 1-based part number used in the summary
+        columns (list): Column names, in order
+    """
+    
+    def __init__(self, filename, part_number, columns):
+        from openpyxl import Workbook
+        
+        self.filename = filename
+        self.part_number = part_number
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet('Jobs Data')
+        self.worksheet.append(_header_row(self.worksheet, columns))
+    
+    def append(self, row):
+        """Write one flattened job"""
+        self.worksheet.append([row.get(column) for column in self.columns])
+    
+    def close(self, summary):
+        """
+        Add the Summary sheet and save the workbook
+        
+        Args:
+            summary (JobSummary): Aggregate of the rows in this part
+        """
+        _append_sheet(self.workbook, 'Summary', ['Metric', 'Value'],
+                      [[f'Jobs in Part {self.part_number}', summary.rows]] + summary.metric_rows())
+        self.workbook.save(self.filename)
+
+def write_excel_part(rows, filename, part_number, columns=None, summary=None):
+    """
+    Write one chunk of flattened jobs to an Excel file with a summary sheet
+    
+    Module level so parts can be written in worker processes.
+    
+    Args:
+        rows (list): Flattened job dictionaries for this part
+        filename (str): Output Excel filename
+        part_number (int): 1-based part number used in the summary
+        columns (list): Column names (default: keys of the first row)
+        summary (JobSummary): Aggregate of rows (default: computed here)
+    
+    Returns:
+        float: Seconds spent writing the file
+    """
+    started = time.perf_counter()
+    part_writer = ExcelPartWriter(filename, part_number, columns or list(rows[0]))
+    if summary is None:
+        summary = JobSummary()
+        for row in rows:
+            summary.add(row)
+    for row in rows:
+        part_writer.append(row)
+    part_writer.close(summary)
+    return time.perf_counter() - started
+
+def write_summary_workbook(filename, sheets):
+    """
+    Write a workbook of small tables, one sheet each
+    
+    Args:
+        filename (str): Output Excel filename
+        sheets (list): (title, header, rows) tuples
+    
+    Returns:
+        float: Seconds spent writing the file
+    """
+    from openpyxl import Workbook
+    
+    started = time.perf_counter()
+    workbook = Workbook(write_only=True)
+    for title, header, rows in sheets:
+        _append_sheet(workbook, title, header, rows)
+    workbook.save(filename)
+    return time.perf_counter() - started
+
+def convert_jobs_to_excel(jobs, output_prefix="jobs", chunk_size=10000, workers=1, excel_workers=1,
+                          approximate_summary=False, metrics=None):
     """
-    Convert JSON job data to Excel files with chunking for large datasets
+    Convert jobs to Excel files with chunking for large datasets
+    
+    Jobs are taken one at a time from any iterable, such as a file reader
+    or a running scrape, and streamed into write-only workbooks. Each part
+    file is finished as soon as chunk_size rows are ready. Summary metrics
+    are aggregated per part in the same pass and the part aggregates are
+    merged into the overall summary, so memory scales with chunk_size
+    rather than with the number of jobs.
     
     Args:
-        json_file (str): Path to input JSON file
+        jobs (iterable): Job dictionaries as returned by the API
         output_prefix (str): Prefix for output files
         chunk_size (int): Maximum rows per Excel file (default: 10000)
+        workers (int): Processes used to flatten jobs (default: 1)
+        excel_workers (int): Processes used to write part files and the
+            summary in parallel (default: 1, write in this process)
+        approximate_summary (bool): Estimate unique sources and top companies
+            with fixed-memory sketches instead of exact counts (default: False)
+        metrics (RunMetrics): Records per-stage timings (load, flatten,
+            html_clean, excel_rows, excel_write, summary, summary_write) and
+            row counts (optional)
     
     Returns:
         list: List of created file names
     """
-    print(f"Converting {json_file} to Excel format...")
-    
+    executor = ProcessPoolExecutor(max_workers=excel_workers) if excel_workers > 1 else None
     try:
-        # Load JSON data
-        with open(json_file, 'r', encoding='utf-8') as f:
-            jobs_data = json.load(f)
+        created_files = []
+        file_breakdown = []
+        pending_writes = deque()
+        columns = []
+        part_writer = None
+        part_rows = []
+        part_summary = None
         
-        print(f"Loaded {len(jobs_data)} jobs from JSON")
+        # Part summaries are merged into this as each part is finished
+        jobs_read = 0
+        total_rows = 0
+        summary = JobSummary(approximate=approximate_summary)
         
-        if not jobs_data:
-            print("No job data found in JSON file")
-            return []
+        def start_part():
+            part_number = len(file_breakdown) + 1
+            filename = f'{output_prefix}_part_{part_number}.xlsx'
+            file_breakdown.append({
+                'File_Name': filename,
+                'Rows': 0,
+                'Start_Index': total_rows + 1,
+                'End_Index': total_rows
+            })
+            created_files.append(filename)
+            return part_number, filename
+        
+        def finish_part():
+            nonlocal part_writer, part_summary
+            part = file_breakdown[-1]
+            part['End_Index'] = total_rows
+            part['Rows'] = total_rows - part['Start_Index'] + 1
+            print(f"Creating {part['File_Name']} with {part['Rows']} jobs...")
+            
+            if executor is None:
+                with timed(metrics, 'excel_write'):
+                    part_writer.close(part_summary)
+                part_writer = None
+                print(f"Created {part['File_Name']} successfully!")
+            else:
+                part_number = len(file_breakdown)
+                pending_writes.append((part['File_Name'], 'excel_write', executor.submit(
+                    write_excel_part, list(part_rows), part['File_Name'], part_number, columns, part_summary)))
+                part_rows.clear()
+                # Bound the number of parts held in memory by worker processes
+                while len(pending_writes) > excel_workers:
+                    wait_for_write()
+            with timed(metrics, 'summary'):
+                summary.merge(part_summary)
+            part_summary = None
+        
+        def wait_for_write():
+            filename, stage, future = pending_writes.popleft()
+            seconds = future.result()
+            if metrics is not None:
+                # Time spent in the worker process, not waiting for it
+                metrics.add_time(stage, seconds)
+            print(f"Created {filename} successfully!")
         
-        # Flatten data for Excel
-        flattened_jobs = []
-        for job in jobs_data:
-            try:
-                flattened = flatten_job_data(job)
-                flattened_jobs.append(flattened)
-            except Exception as e:
-                print(f"Error processing job {job.get('id', 'unknown')}: {e}")
+        # Flatten data for Excel, streaming jobs from the source
+        if metrics is not None:
+            jobs = timed_iter(jobs, metrics, 'load')
+        for flattened in iter_flattened_jobs(jobs, workers=workers, metrics=metrics):
+            jobs_read += 1
+            if flattened is None:
                 continue
+            
+            if not columns:
+                columns = list(flattened)
+            if total_rows % chunk_size == 0:
+                part_number, filename = start_part()
+                part_summary = JobSummary(approximate=approximate_summary)
+                if executor is None:
+                    part_writer = ExcelPartWriter(filename, part_number, columns)
+            
+            if executor is None:
+                with timed(metrics, 'excel_rows'):
+                    part_writer.append(flattened)
+            else:
+                part_rows.append(flattened)
+            with timed(metrics, 'summary'):
+                part_summary.add(flattened)
+            total_rows += 1
+            
+            if total_rows % chunk_size == 0:
+                finish_part()
         
-        if not flattened_jobs:
-            print("No jobs could be processed")
-            return []
+        print(f"Loaded {jobs_read} jobs")
+        if metrics is not None:
+            metrics.increment('rows', total_rows)
+            metrics.increment('jobs_read', jobs_read)
+            metrics.increment('jobs_failed', jobs_read - total_rows)
         
-        # Create DataFrame
-        df = pd.DataFrame(flattened_jobs)
+        if not jobs_read:
+            print("No job data found")
+            return []
         
-        # Calculate number of chunks needed
-        total_chunks = (len(df) + chunk_size - 1) // chunk_size
-        created_files = []
+        if not total_rows:
+            print("No jobs could be processed")
+            return []
         
-        print(f"Splitting {len(df)} jobs into {total_chunks} Excel file(s) ({chunk_size} rows each max)...")
+        if total_rows % chunk_size:
+            finish_part()
         
-        # Create chunked Excel files
-        for i in range(0, len(df), chunk_size):
-            chunk = df[i:i+chunk_size]
-            part_number = i//chunk_size + 1
-            filename = f'{output_prefix}_part_{part_number}.xlsx'
-            
-            print(f"Creating {filename} with {len(chunk)} jobs...")
-            
-            # Create Excel file for this chunk
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                # Main data sheet
-                chunk.to_excel(writer, sheet_name='Jobs Data', index=False)
-                
-                # Add a summary sheet for this chunk
-                chunk_summary = {
-                    'Metric': [
-                        f'Jobs in Part {part_number}',
-                        'Unique Sources',
-                        'Total Viewed',
-                        'Total Applied',
-                        'Total Saved',
-                        'Total Hidden'
-                    ],
-                    'Value': [
-                        len(chunk),
-                        chunk['source'].nunique(),
-                        chunk['viewed_count'].sum(),
-                        chunk['applied_count'].sum(),
-                        chunk['saved_count'].sum(),
-                        chunk['hidden_count'].sum()
-                    ]
-                }
-                chunk_summary_df = pd.DataFrame(chunk_summary)
-                chunk_summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            print(f"Created {filename} successfully!")
-            created_files.append(filename)
+        total_chunks = len(file_breakdown)
         
         # Create overall summary file
         summary_filename = f'{output_prefix}_overall_summary.xlsx'
-        with pd.ExcelWriter(summary_filename, engine='openpyxl') as writer:
-            # Overall summary
-            summary_data = {
-                'Metric': [
-                    'Total Jobs',
-                    'Total Excel Files',
-                    'Jobs per File (Max)',
-                    'Unique Sources',
-                    'Total Viewed',
-                    'Total Applied', 
-                    'Total Saved',
-                    'Total Hidden'
-                ],
-                'Value': [
-                    len(df),
-                    total_chunks,
-                    chunk_size,
-                    df['source'].nunique(),
-                    df['viewed_count'].sum(),
-                    df['applied_count'].sum(),
-                    df['saved_count'].sum(),
-                    df['hidden_count'].sum()
-                ]
-            }
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Overall Summary', index=False)
-            
+        summary_started = time.perf_counter()
+        summary_sheets = [
+            ('Overall Summary', ['Metric', 'Value'], [
+                ['Total Jobs', summary.rows],
+                ['Total Excel Files', total_chunks],
+                ['Jobs per File (Max)', chunk_size],
+            ] + summary.metric_rows()),
             # Top companies (top 50)
-            top_companies = df['source_and_board_token'].value_counts().head(50)
-            top_companies_df = pd.DataFrame({
-                'Company_Board': top_companies.index,
-                'Job_Count': top_companies.values
-            })
-            top_companies_df.to_excel(writer, sheet_name='Top Companies', index=False)
-            
+            ('Top Companies', ['Company_Board', 'Job_Count'],
+             [list(item) for item in summary.top_companies(50)]),
             # File breakdown
-            file_breakdown = []
-            for i in range(total_chunks):
-                start_idx = i * chunk_size
-                end_idx = min((i + 1) * chunk_size, len(df))
-                file_breakdown.append({
-                    'File_Name': f'{output_prefix}_part_{i+1}.xlsx',
-                    'Rows': end_idx - start_idx,
-                    'Start_Index': start_idx + 1,
-                    'End_Index': end_idx
-                })
-            
-            breakdown_df = pd.DataFrame(file_breakdown)
-            breakdown_df.to_excel(writer, sheet_name='File Breakdown', index=False)
+            ('File Breakdown', ['File_Name', 'Rows', 'Start_Index', 'End_Index'],
+             [list(part.values()) for part in file_breakdown]),
+        ]
+        if metrics is not None:
+            metrics.add_time('summary', time.perf_counter() - summary_started)
+        if executor is None:
+            with timed(metrics, 'summary_write'):
+                write_summary_workbook(summary_filename, summary_sheets)
+        else:
+            pending_writes.append((summary_filename, 'summary_write',
+                                   executor.submit(write_summary_workbook, summary_filename, summary_sheets)))
+            while pending_writes:
+                wait_for_write()
         
         created_files.append(summary_filename)
         
         print(f"\nSuccessfully created {total_chunks} Excel file(s)!")
         print(f"Overall summary: {summary_filename}")
         print(f"Each file contains max {chunk_size:,} rows")
-        print(f"Total data: {len(df):,} jobs across {len(df.columns)} columns")
+        print(f"Total data: {total_rows:,} jobs across {len(columns)} columns")
         print(f"\nFiles created:")
         for file in created_files:
             print(f"  - {file}")
         
         return created_files
-        
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def convert_json_to_excel(json_file, output_prefix="jobs", chunk_size=10000, workers=1, excel_workers=1,
+                          approximate_summary=False, metrics=None):
+    """
+    Convert a JSON job file to Excel files with chunking for large datasets
+    
+    Jobs are read one at a time from a JSON array or NDJSON file (optionally
+    .gz/.zst compressed) and passed to convert_jobs_to_excel().
+    
+    Args:
+        json_file (str): Path to input JSON or NDJSON file
+        output_prefix (str): Prefix for output files
+        chunk_size (int): Maximum rows per Excel file (default: 10000)
+        workers (int): Processes used to flatten jobs (default: 1)
+        excel_workers (int): Processes used to write part files and the
+            summary in parallel (default: 1, write in this process)
+        approximate_summary (bool): Estimate unique sources and top companies
+            with fixed-memory sketches instead of exact counts (default: False)
+        metrics (RunMetrics): Records per-stage timings and row counts (optional)
+    
+    Returns:
+        list: List of created file names
+    """
+    print(f"Converting {json_file} to Excel format...")
+    
+    try:
+        return convert_jobs_to_excel(iter_jobs_from_file(json_file), output_prefix, chunk_size=chunk_size,
+                                     workers=workers, excel_workers=excel_workers,
+                                     approximate_summary=approximate_summary, metrics=metrics)
     except FileNotFoundError:
         print(f"Error: JSON file '{json_file}' not found")
         return []
@@ -225,21 +507,67 @@ def convert_json_to_excel(json_file, output_prefix="jobs", chunk_size=10000):
         print(f"Error converting to Excel: {e}")
         return []
 
-if __name__ == "__main__":
-    # Example usage
-    json_filename = input("Enter JSON filename to convert: ")
+def default_output_prefix(json_filename):
+    """Derive the Excel output prefix from a job file name"""
+    output_prefix = strip_compression_extension(json_filename)
+    for extension in ('.ndjson', '.jsonl', '.json'):
+        output_prefix = output_prefix.replace(extension, '')
+    return output_prefix.replace('_jobs', '')
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the converter"""
+    parser = argparse.ArgumentParser(description="Convert scraped jobs to Excel files")
+    parser.add_argument('json_file', nargs='?', help="JSON/NDJSON job file (prompted for if omitted)")
+    parser.add_argument('--output-prefix', help="Prefix for output files (default: from the input name)")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Maximum rows per Excel file (default: 10000)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to flatten jobs (default: 1)")
+    parser.add_argument('--excel-workers', type=int, default=1,
+                        help="Processes used to write Excel files in parallel (default: 1)")
+    parser.add_argument('--approximate-summary', action='store_true',
+                        help="Estimate unique sources and top companies in fixed memory")
+    parser.add_argument('--metrics-json', help="Write a JSON run report with per-stage timings to this file")
+    parser.add_argument('--metrics-prom', help="Write run metrics in Prometheus text format to this file")
+    return parser.parse_args(argv)
+
+def main(argv=None, interactive=True):
+    """
+    Run the converter command line
+    
+    Args:
+        argv (list): Arguments (default: sys.argv[1:])
+        interactive (bool): Prompt for a missing file name instead of
+            failing (default: True)
+    """
+    args = parse_args(argv)
+    if not args.json_file and not interactive:
+        raise SystemExit("error: a JSON/NDJSON job file is required")
+    json_filename = args.json_file or input("Enter JSON filename to convert: ")
     
-    if not json_filename.endswith('.json'):
+    if not strip_compression_extension(json_filename).endswith(('.json', '.ndjson', '.jsonl')):
         json_filename += '.json'
     
     # Extract prefix from filename for output files
-    output_prefix = json_filename.replace('.json', '').replace('_jobs', '')
+    output_prefix = args.output_prefix or default_output_prefix(json_filename)
+    
+    metrics = RunMetrics('convert') if args.metrics_json or args.metrics_prom else None
     
     # Convert to Excel
-    created_files = convert_json_to_excel(json_filename, output_prefix)
+    created_files = convert_json_to_excel(json_filename, output_prefix,
+                                          chunk_size=args.chunk_size, workers=args.workers,
+                                          excel_workers=args.excel_workers,
+                                          approximate_summary=args.approximate_summary,
+                                          metrics=metrics)
+    if metrics is not None:
+        write_run_metrics(metrics, args.metrics_json, args.metrics_prom)
     
     if created_files:
         print(f"\nConversion completed successfully!")
         print(f"Created {len(created_files)} file(s)")
     else:
-        print("\nConversion failed!")
\ No newline at end of file
+        print("\nConversion failed!")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
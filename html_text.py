@@ -0,0 +1,150 @@
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+from bs4.dammit import EntitySubstitution
+
+# Tag configuration is read from the installed BeautifulSoup so the fast path
+# makes the same decisions as BeautifulSoup(html, 'html.parser'). Some of these
+# are private bs4 internals; 'benchmarks/run_benchmarks.py --check-html'
+# verifies the output still matches after a bs4 upgrade
+_VOID_TAGS = frozenset(getattr(HTMLTreeBuilder, 'DEFAULT_EMPTY_ELEMENT_TAGS', None)
+                       or getattr(HTMLTreeBuilder, 'empty_element_tags', None)
+                       or ())
+# Text inside these tags (script, style, template, ...) is not returned by get_text()
+_NON_TEXT_CONTAINERS = frozenset(getattr(HTMLTreeBuilder, 'DEFAULT_STRING_CONTAINERS', None) or ())
+_NAMED_ENTITIES = EntitySubstitution.HTML_ENTITY_TO_CHARACTER
+_dereference_numeric = getattr(BeautifulSoupHTMLParser, '_dereference_numeric_character_reference', None)
+
+
+class _UnsupportedMarkup(Exception):
+    """Raised when the fast path cannot reproduce BeautifulSoup exactly"""
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Streaming tag stripper equivalent to BeautifulSoup.get_text(strip=True)
+
+    Uses the same tokenizer as BeautifulSoup's html.parser builder but keeps
+    only a stack of open tag names instead of building a tree. Text between
+    two structural events is merged, stripped and kept unless it sits inside
+    a non-text container such as <script>.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.pieces = []
+        self.current_data = []
+        self.open_tags = []
+        self.open_counts = {}
+        self.containers = []
+        self.already_closed_void = []
+
+    def end_data(self, keep=None):
+        """Flush merged text; keep overrides the container check (CDATA)"""
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        if keep is None:
+            keep = not self.containers
+        if keep:
+            data = data.strip()
+            if data:
+                self.pieces.append(data)
+
+    def push_tag(self, tag):
+        self.open_tags.append(tag)
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+        if tag in _NON_TEXT_CONTAINERS:
+            self.containers.append(len(self.open_tags) - 1)
+
+    def pop_tag(self):
+        tag = self.open_tags.pop()
+        self.open_counts[tag] -= 1
+        if self.containers and self.containers[-1] == len(self.open_tags):
+            self.containers.pop()
+
+    def pop_to_tag(self, tag):
+        while self.open_counts.get(tag):
+            if self.open_tags[-1] == tag:
+                self.pop_tag()
+                break
+            self.pop_tag()
+
+    def handle_starttag(self, tag, attrs, handle_void=True):
+        self.end_data()
+        self.push_tag(tag)
+        if handle_void and tag in _VOID_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_void=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.already_closed_void:
+            self.already_closed_void.remove(tag)
+        else:
+            self.end_data()
+            self.pop_to_tag(tag)
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def handle_entityref(self, name):
+        character = _NAMED_ENTITIES.get(name)
+        self.current_data.append(character if character is not None else f'&{name}')
+
+    def handle_charref(self, name):
+        if _dereference_numeric is None:
+            raise _UnsupportedMarkup(name)
+        dereferenced, _, extra_data = _dereference_numeric(name)
+        if dereferenced is not None:
+            self.current_data.append(dereferenced)
+        if extra_data is not None:
+            self.current_data.append(extra_data)
+
+    def handle_comment(self, data):
+        self.end_data()
+
+    def handle_decl(self, decl):
+        self.end_data()
+
+    def handle_pi(self, data):
+        self.end_data()
+
+    def unknown_decl(self, data):
+        self.end_data()
+        if data.upper().startswith('CDATA['):
+            # CDATA sections are returned by get_text() even inside containers
+            self.current_data.append(data[len('CDATA['):])
+            self.end_data(keep=True)
+
+
+def extract_text(html_text, separator=''):
+    """
+    Extract the visible text from an HTML fragment
+
+    Gives the same result as BeautifulSoup(html_text, 'html.parser')
+    .get_text(separator, strip=True) without building a parse tree. Markup
+    the fast path cannot reproduce exactly is handed to BeautifulSoup instead.
+
+    Args:
+        html_text (str): HTML content
+        separator (str): Put between text nodes (default: '', which glues
+            '<li>a</li><li>b</li>' into 'ab')
+
+    Returns:
+        str: Stripped text of every text node, joined with separator
+    """
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(html_text)
+        extractor.close()
+    except Exception:
+        return BeautifulSoup(html_text, 'html.parser').get_text(separator, strip=True)
+    extractor.end_data()
+    return separator.join(extractor.pieces)
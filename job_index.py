@@ -0,0 +1,112 @@
+import hashlib
+import json
+import sqlite3
+
+from job_projection import INTERACTION_FIELDS
+
+# Keys added by this tool rather than returned by the API
+LOCAL_KEYS = ('matched_queries', 'change_type')
+
+def open_job_index(filename):
+    """
+    Open (or create) the local SQLite index of previously scraped jobs
+
+    Every row records one job id seen for one search query, with a hash of
+    the job content and when it was last seen.
+
+    Args:
+        filename (str): Path to the SQLite database file
+
+    Returns:
+        sqlite3.Connection: Open connection to the index
+    """
+    conn = sqlite3.connect(filename)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            query TEXT NOT NULL,
+            id TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            PRIMARY KEY (query, id)
+        )
+    ''')
+    conn.commit()
+    return conn
+
+def job_content_hash(job):
+    """
+    Hash the content of a job so changes can be detected between runs
+
+    The interaction lists (views, applications, saves, hides) are left out,
+    so a job only counts as changed when the posting itself changes.
+
+    Args:
+        job (dict): Job dictionary as returned by the API
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding
+    """
+    content = {key: value for key, value in job.items() if key not in LOCAL_KEYS}
+    job_info = content.get('job_information')
+    if isinstance(job_info, dict):
+        content['job_information'] = {key: value for key, value in job_info.items()
+                                      if key not in INTERACTION_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def record_jobs(conn, query, jobs, run_started):
+    """
+    Compare jobs against the index and store their current state
+
+    Args:
+        conn (sqlite3.Connection): Open job index
+        query (str): Search query the jobs were found for
+        jobs (iterable): Job dictionaries with an 'id'
+        run_started (float): Timestamp identifying the current run
+
+    Returns:
+        list: (change, job) pairs where change is 'new', 'changed' or
+            'unchanged', in input order
+    """
+    changes = []
+    for job in jobs:
+        job_id = str(job.get('id', ''))
+        content_hash = job_content_hash(job)
+        row = conn.execute('SELECT content_hash FROM jobs WHERE query = ? AND id = ?',
+                           (query, job_id)).fetchone()
+
+        if row is None:
+            change = 'new'
+            conn.execute('INSERT INTO jobs (query, id, content_hash, first_seen, last_seen) '
+                         'VALUES (?, ?, ?, ?, ?)',
+                         (query, job_id, content_hash, run_started, run_started))
+        else:
+            change = 'unchanged' if row[0] == content_hash else 'changed'
+            conn.execute('UPDATE jobs SET content_hash = ?, last_seen = ? WHERE query = ? AND id = ?',
+                         (content_hash, run_started, query, job_id))
+        changes.append((change, job))
+
+    conn.commit()
+    return changes
+
+def pop_disappeared_jobs(conn, query, run_started):
+    """
+    Remove and return the jobs of a query that were not seen in this run
+
+    Only call this after a complete run; an interrupted or early-stopped run
+    would report every job it did not reach as disappeared.
+
+    Args:
+        conn (sqlite3.Connection): Open job index
+        query (str): Search query to check
+        run_started (float): Timestamp identifying the current run
+
+    Returns:
+        list: Ids of jobs that disappeared since the previous run
+    """
+    rows = conn.execute('SELECT id FROM jobs WHERE query = ? AND last_seen < ? ORDER BY first_seen, id',
+                        (query, run_started)).fetchall()
+    conn.execute('DELETE FROM jobs WHERE query = ? AND last_seen < ?', (query, run_started))
+    conn.commit()
+    return [row[0] for row in rows]
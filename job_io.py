@@ -0,0 +1,304 @@
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+COMPRESSED_EXTENSIONS = ('.gz', '.zst')
+
+def strip_compression_extension(filename):
+    """
+    Remove a trailing .gz or .zst extension from a filename
+    
+    Args:
+        filename (str): File name or path
+    
+    Returns:
+        str: Filename without the compression extension
+    """
+    for extension in COMPRESSED_EXTENSIONS:
+        if filename.endswith(extension):
+            return filename[:-len(extension)]
+    return filename
+
+def decode_json(data):
+    """
+    Decode a JSON document, using orjson when it is installed
+    
+    Args:
+        data (str or bytes): JSON text
+    
+    Returns:
+        Decoded value
+    
+    Raises:
+        ValueError: If the text is not valid JSON (json.JSONDecodeError,
+            which orjson's error subclasses)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def is_ndjson_filename(filename):
+    """
+    Check whether a filename points to newline-delimited JSON
+    
+    Args:
+        filename (str): File name or path, optionally ending in .gz or .zst
+    
+    Returns:
+        bool: True for .ndjson/.jsonl files
+    """
+    return strip_compression_extension(filename).endswith(NDJSON_EXTENSIONS)
+
+def open_job_file(filename, mode='rt'):
+    """
+    Open a job file as text, compressing or decompressing by extension
+    
+    Files ending in .gz use gzip and files ending in .zst use zstandard
+    (requires the optional 'zstandard' package). Anything else is opened
+    as plain UTF-8 text.
+    
+    Args:
+        filename (str): Path to the file
+        mode (str): Text mode such as 'rt', 'wt' or 'at' (default: 'rt')
+    
+    Returns:
+        file object: Text stream for the file
+    """
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode, encoding='utf-8')
+    if filename.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading or writing .zst files requires the 'zstandard' package "
+                              "(pip install zstandard)")
+        return zstandard.open(filename, mode, encoding='utf-8')
+    return open(filename, mode, encoding='utf-8')
+
+def write_jobs_ndjson(jobs, filename, append=False):
+    """
+    Stream jobs to a newline-delimited JSON file
+    
+    Each job is written as soon as it is produced, so jobs can be a
+    generator and only the current item is held in memory.
+    
+    Args:
+        jobs (iterable): Job dictionaries
+        filename (str): Output filename (.gz/.zst are compressed)
+        append (bool): Append to an existing file instead of replacing it
+    
+    Returns:
+        int: Number of jobs written
+    """
+    count = 0
+    with open_job_file(filename, 'at' if append else 'wt') as f:
+        for job in jobs:
+            f.write(json.dumps(job, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+def _iter_json_array(f, read_size=1 << 20):
+    """Yield the items of a top-level JSON array one at a time from a text stream"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+    
+    while True:
+        # Skip whitespace and separators between items
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        
+        if pos >= len(buffer):
+            if eof:
+                raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+            buffer = f.read(read_size)
+            pos = 0
+            eof = not buffer
+            continue
+        
+        if not started:
+            if buffer[pos] != '[':
+                raise json.JSONDecodeError("Expecting '['", buffer, pos)
+            started = True
+            pos += 1
+            continue
+        
+        if buffer[pos] == ']':
+            return
+        
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The item is cut off at the end of the buffer; read more and retry
+            more = f.read(read_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        
+        yield item
+        pos = end
+        if pos > read_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+def _iter_ndjson(f):
+    """Yield one decoded value per non-blank line of a text stream"""
+    for line in f:
+        if line.strip():
+            yield decode_json(line)
+
+class _PrefixedStream:
+    """Text stream wrapper that replays characters already read from f"""
+    
+    def __init__(self, prefix, f):
+        self.prefix = prefix
+        self.f = f
+    
+    def read(self, size=-1):
+        prefix, self.prefix = self.prefix, ''
+        if size is not None and size >= 0:
+            return prefix + self.f.read(max(size - len(prefix), 0))
+        return prefix + self.f.read()
+    
+    def __iter__(self):
+        prefix, self.prefix = self.prefix, ''
+        first_line = prefix + self.f.readline()
+        if first_line:
+            yield first_line
+        yield from self.f
+
+def iter_jobs_from_file(filename):
+    """
+    Read jobs from a JSON array or NDJSON file one at a time
+    
+    The format is detected from the first non-whitespace character: '['
+    means a JSON array (as written by save_jobs_to_json), anything else is
+    treated as newline-delimited JSON. Compressed .gz/.zst files are
+    decompressed on the fly. Memory use does not depend on the file size.
+    
+    Args:
+        filename (str): Path to the job file
+    
+    Yields:
+        dict: Job dictionaries in file order
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+        json.JSONDecodeError: If the file is not valid JSON/NDJSON
+    """
+    with open_job_file(filename, 'rt') as f:
+        first_char = ''
+        while True:
+            first_char = f.read(1)
+            if not first_char or not first_char.isspace():
+                break
+        
+        if not first_char:
+            return
+        
+        if first_char == '[':
+            yield from _iter_json_array(_PrefixedStream(first_char, f))
+        else:
+            yield from _iter_ndjson(_PrefixedStream(first_char, f))
+
+def search_state_fingerprint(search_state):
+    """
+    Hash a search state so a checkpoint can be matched to its query
+    
+    Args:
+        search_state (dict): Search state sent to the API
+    
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(search_state, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def load_checkpoint(filename):
+    """
+    Load a scrape checkpoint
+    
+    Args:
+        filename (str): Path to the checkpoint file
+    
+    Returns:
+        dict: Checkpoint with 'fingerprint', 'output', 'pages_completed',
+            'job_ids' and 'complete', or None if the file is missing or
+            unreadable
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(filename, checkpoint):
+    """
+    Write a scrape checkpoint atomically
+    
+    Args:
+        filename (str): Path to the checkpoint file
+        checkpoint (dict): JSON-serializable checkpoint data
+    """
+    temp_filename = f'{filename}.tmp'
+    with open(temp_filename, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_filename, filename)
+
+def recover_ndjson_output(filename, offset=None):
+    """
+    Cut an NDJSON output back to its last complete job after a crash
+    
+    A plain file with a known offset (its size when the last checkpoint
+    was saved) is truncated to that offset, dropping a partial trailing
+    line and any page written after the checkpoint. Otherwise, as for
+    .gz/.zst files, which cannot be truncated in place, the file is read
+    up to the first partial line or truncated stream and rewritten with
+    the complete jobs only.
+    
+    Args:
+        filename (str): Path to the NDJSON output
+        offset (int): Byte size of a plain file at the last checkpoint (optional)
+    
+    Returns:
+        list: Ids of the jobs kept when the file was rewritten, or None if
+            it was truncated to offset
+    """
+    if (offset is not None and not filename.endswith(COMPRESSED_EXTENSIONS)
+            and os.path.getsize(filename) >= offset):
+        os.truncate(filename, offset)
+        return None
+    
+    directory, basename = os.path.split(filename)
+    temp_filename = os.path.join(directory, f'.recover-{basename}')
+    job_ids = []
+    with open_job_file(temp_filename, 'wt') as out:
+        try:
+            with open_job_file(filename, 'rt') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    if line.strip():
+                        job = decode_json(line)
+                        out.write(line)
+                        if isinstance(job, dict) and 'id' in job:
+                            job_ids.append(job['id'])
+        except (EOFError, ValueError):
+            # A gzip stream cut off mid-member or a line cut off mid-job;
+            # everything before it is kept
+            pass
+    os.replace(temp_filename, filename)
+    return job_ids
@@ -0,0 +1,108 @@
+# User interaction lists in job_information; only their lengths are exported
+INTERACTION_FIELDS = ('viewedByUsers', 'appliedFromUsers', 'savedFromUsers', 'hiddenFromUsers')
+
+# keep: store the lists as returned, count: replace each list by its length,
+# ids: replace each list by its sorted user ids
+INTERACTION_MODES = ('keep', 'count', 'ids')
+
+def _user_id(user):
+    """Return the id of one interaction entry (a plain id or a user object)"""
+    if isinstance(user, dict):
+        for key in ('id', 'userId', 'user_id'):
+            if key in user:
+                return user[key]
+    return user
+
+def compact_user_ids(users):
+    """
+    Reduce an interaction list to its sorted user ids
+
+    Ids are stored as integers when every id is numeric, otherwise as
+    strings, so the result sorts and compresses well.
+
+    Args:
+        users (list): Interaction entries (ids or user objects)
+
+    Returns:
+        list: Sorted user ids
+    """
+    ids = [_user_id(user) for user in users]
+    try:
+        return sorted(int(user_id) for user_id in ids)
+    except (TypeError, ValueError):
+        return sorted(str(user_id) for user_id in ids)
+
+def interaction_count(value):
+    """
+    Number of users in an interaction field, whether stored as a list or a count
+
+    Args:
+        value (list or int): Interaction field of job_information
+
+    Returns:
+        int: Number of users
+    """
+    if isinstance(value, int):
+        return value
+    return len(value)
+
+class JobProjection:
+    """
+    Scrape-time projection that drops or compacts bulky parts of each job
+
+    Applied to every job as pages are decoded, so the scraper keeps and
+    writes only what later stages need. Jobs are modified in place.
+
+    Args:
+        interactions (str): How to store the user interaction lists: 'keep',
+            'count' or 'ids' (default: 'count')
+        drop_fields (iterable): Dotted paths of fields to remove, e.g.
+            'job_information.description' (optional)
+    """
+
+    def __init__(self, interactions='count', drop_fields=()):
+        if interactions not in INTERACTION_MODES:
+            raise ValueError(f"Unknown interactions mode '{interactions}', "
+                             f"expected one of {', '.join(INTERACTION_MODES)}")
+        self.interactions = interactions
+        self.drop_paths = [tuple(path.split('.')) for path in drop_fields]
+
+    def _drop(self, job, path):
+        parent = job
+        for key in path[:-1]:
+            parent = parent.get(key)
+            if not isinstance(parent, dict):
+                return
+        parent.pop(path[-1], None)
+
+    def __call__(self, job):
+        """
+        Project one job
+
+        Args:
+            job (dict): Job dictionary as returned by the API
+
+        Returns:
+            dict: The same job, projected
+        """
+        if not isinstance(job, dict):
+            return job
+        for path in self.drop_paths:
+            self._drop(job, path)
+
+        job_info = job.get('job_information')
+        if self.interactions != 'keep' and isinstance(job_info, dict):
+            for field in INTERACTION_FIELDS:
+                users = job_info.get(field)
+                if isinstance(users, list):
+                    if self.interactions == 'count':
+                        job_info[field] = len(users)
+                    else:
+                        job_info[field] = compact_user_ids(users)
+        return job
+
+    def project_all(self, jobs):
+        """Project a list of jobs in place and return it"""
+        for job in jobs:
+            self(job)
+        return jobs
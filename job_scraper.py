@@ -1,39 +1,62 @@
+import argparse
+import atexit
 import requests
 import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
-def scrape_hiring_cafe_jobs(search_query):
+from job_index import open_job_index, pop_disappeared_jobs, record_jobs
+from job_io import (COMPRESSED_EXTENSIONS, decode_json, is_ndjson_filename, load_checkpoint,
+                    iter_jobs_from_file, recover_ndjson_output, save_checkpoint, search_state_fingerprint,
+                    write_jobs_ndjson)
+from job_projection import INTERACTION_MODES, JobProjection
+from metrics import RunMetrics, timed, write_run_metrics
+from response_cache import CachedSession, ResponseCache
+from throttling import AdaptiveConcurrencyLimiter, ThrottledAdapter, TokenBucket
+
+# API endpoints (HIRING_CAFE_BASE_URL points the scraper at a mirror or a local mock server)
+BASE_URL = os.environ.get('HIRING_CAFE_BASE_URL', "https://hiring.cafe").rstrip('/')
+COUNT_ENDPOINT = f"{BASE_URL}/api/search-jobs/get-total-count"
+JOBS_ENDPOINT = f"{BASE_URL}/api/search-jobs"
+
+PAGE_SIZE = 1000  # Maximum page size
+MAX_PAGE = 50  # Last page index we request (safety limit)
+MAX_RESULTS = (MAX_PAGE + 1) * PAGE_SIZE  # Most results one search state can return
+
+# Search state filters a query can be split on when it exceeds MAX_RESULTS
+SHARD_DIMENSIONS = ['workplaceTypes', 'commitmentTypes', 'seniorityLevel', 'roleTypes']
+
+# Headers to mimic browser request
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Content-Type': 'application/json',
+    'Referer': 'https://hiring.cafe/',
+    'Origin': 'https://hiring.cafe',
+    'sec-ch-ua': '"Chromium";v="139", "Not;A=Brand";v="99"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin'
+}
+
+
+def build_search_state(search_query):
     """
-    Scrape job listings from hiring.cafe API based on search query
+    Build the search state sent to the hiring.cafe API
     
     Args:
         search_query (str): The search term for job listings
     
     Returns:
-        list: List of job dictionaries or empty list if failed
+        dict: Search state with the default filter settings
     """
-    
-    # API endpoints
-    base_url = "https://hiring.cafe"
-    count_endpoint = f"{base_url}/api/search-jobs/get-total-count"
-    jobs_endpoint = f"{base_url}/api/search-jobs"
-    
-    # Headers to mimic browser request
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Content-Type': 'application/json',
-        'Referer': 'https://hiring.cafe/',
-        'Origin': 'https://hiring.cafe',
-        'sec-ch-ua': '"Chromium";v="139", "Not;A=Brand";v="99"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"Windows"',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-origin'
-    }
-    
     # Search state configuration - comprehensive filter settings
     search_state = {
         "locations": [{
@@ -146,116 +169,805 @@ def scrape_hiring_cafe_jobs(search_query):
         "excludedLatestInvestmentSeries": []
     }
     
-    # Request payloads
+    return search_state
+
+def create_session(pool_size=10, cache=None, requests_per_second=None, retries=3, projection=None,
+                   metrics=None):
+    """
+    Create a requests session with the browser headers applied
+    
+    Every request goes through a ThrottledAdapter: 429/5xx responses and
+    connection errors are retried with jittered exponential backoff (honouring
+    Retry-After), and the number of requests in flight adapts to the error
+    rate (AIMD) between 1 and pool_size.
+    
+    Args:
+        pool_size (int): Number of keep-alive connections kept open (default: 10)
+        cache (ResponseCache): Serve repeated API requests from this on-disk
+            cache (optional)
+        requests_per_second (float): Pace requests with a token bucket
+            (default: no pacing)
+        retries (int): Retries per request before giving up (default: 3)
+        projection (JobProjection): Applied to every job as pages are
+            decoded, e.g. to turn interaction lists into counts (optional)
+        metrics (RunMetrics): Records stage timings, bytes, requests and
+            retries for every request made with the session (optional)
+    
+    Returns:
+        requests.Session: Session ready for the hiring.cafe API
+    """
+    session = CachedSession(cache) if cache is not None else requests.Session()
+    session.headers.update(HEADERS)
+    rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+    adapter = ThrottledAdapter(rate_limiter=rate_limiter,
+                               concurrency_limiter=AdaptiveConcurrencyLimiter(pool_size),
+                               retries=retries, metrics=metrics,
+                               pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.job_projection = projection
+    session.metrics = metrics
+    return session
+
+def _stage(session, name):
+    """Time a block as a stage of the session's metrics, if it has any"""
+    return timed(getattr(session, 'metrics', None), name)
+
+@contextmanager
+def _session_scope(session, pool_size):
+    """Use the caller's session, or create one and close it afterwards"""
+    if session is not None:
+        yield session
+        return
+    
+    session = create_session(pool_size=pool_size)
+    try:
+        yield session
+    finally:
+        session.close()
+
+def get_total_count(session, search_state):
+    """
+    Get the total number of jobs matching a search state
+    
+    Args:
+        session (requests.Session): Session used for the request
+        search_state (dict): Search state to count jobs for
+    
+    Returns:
+        int: Total jobs available, or 0 if the count is unknown
+    """
     count_payload = {
         "searchState": search_state
     }
     
+    with _stage(session, 'count_request'):
+        count_response = session.post(COUNT_ENDPOINT, json=count_payload, timeout=30)
+    print(f"Count API Status: {count_response.status_code}")
+    
+    total_jobs = 0
+    if count_response.status_code == 200:
+        try:
+            count_data = count_response.json()
+            print(f"Count response: {count_data}")
+            if isinstance(count_data, dict) and 'total' in count_data:
+                total_jobs = count_data['total']
+                print(f"Total jobs available: {total_jobs}")
+        except ValueError:
+            print("Count response not JSON:", count_response.text[:200])
+    
+    return total_jobs
+
+def extract_jobs_from_response(jobs_data):
+    """
+    Extract the list of jobs from a search API response
+    
+    Args:
+        jobs_data (dict or list): Decoded JSON response
+    
+    Returns:
+        list: Job dictionaries found in the response (may be empty)
+    """
+    current_batch = []
+    
+    if isinstance(jobs_data, dict):
+        print(f"Jobs response keys: {list(jobs_data.keys())}")
+        
+        # Look for job data in various possible keys
+        possible_keys = ['results', 'jobs', 'data', 'items', 'content']
+        for key in possible_keys:
+            if key in jobs_data and isinstance(jobs_data[key], list):
+                current_batch = jobs_data[key]
+                print(f"Found jobs in '{key}': {len(current_batch)} items")
+                break
+        
+        if not current_batch and 'hits' in jobs_data:
+            # Elasticsearch-style response
+            hits = jobs_data['hits']
+            if isinstance(hits, dict) and 'hits' in hits:
+                current_batch = [hit.get('_source', hit) for hit in hits['hits']]
+                print(f"Found jobs in Elasticsearch format: {len(current_batch)} items")
+        
+    elif isinstance(jobs_data, list):
+        current_batch = jobs_data
+        print(f"Got direct list with {len(current_batch)} jobs")
+    
+    return current_batch
+
+def fetch_jobs_page(session, search_state, page):
+    """
+    Fetch a single page of jobs
+    
+    Jobs are passed through the session's job projection, if it has one.
+    
+    Args:
+        session (requests.Session): Session used for the request
+        search_state (dict): Search state to fetch jobs for
+        page (int): Zero-based page index
+    
+    Returns:
+        list: Jobs on the page, or None if the request failed
+    """
     jobs_payload = {
-        "size": 1000,  # Maximum page size
-        "page": 0,
+        "size": PAGE_SIZE,
+        "page": page,
         "searchState": search_state
     }
     
-    session = requests.Session()
-    session.headers.update(headers)
+    metrics = getattr(session, 'metrics', None)
+    
+    print(f"\nGetting page {page} with size {PAGE_SIZE}...")
+    started = time.perf_counter()
+    with _stage(session, 'page_fetch'):
+        jobs_response = session.post(JOBS_ENDPOINT, json=jobs_payload, timeout=30)
+        content = jobs_response.content
+    fetch_seconds = time.perf_counter() - started
+    print(f"Jobs API Status (page {page}): {jobs_response.status_code}")
+    
+    if metrics is not None:
+        metrics.increment('bytes_received', len(content))
+        if getattr(jobs_response, 'from_cache', False):
+            metrics.increment('cache_hits')
+        metrics.record_event('page', query=search_state.get('searchQuery', ''), page=page,
+                             status=jobs_response.status_code, seconds=fetch_seconds, bytes=len(content))
     
+    if jobs_response.status_code != 200:
+        print(f"Jobs API failed: {jobs_response.status_code}")
+        print("Error response:", jobs_response.text[:300])
+        return None
+    
+    try:
+        with _stage(session, 'json_decode'):
+            jobs_data = decode_json(content)
+    except ValueError:
+        print("Jobs response not JSON:", jobs_response.text[:200])
+        return None
+    
+    print(f"Jobs response type: {type(jobs_data)}")
+    current_batch = extract_jobs_from_response(jobs_data)
+    
+    projection = getattr(session, 'job_projection', None)
+    if projection is not None:
+        with _stage(session, 'projection'):
+            projection.project_all(current_batch)
+    if metrics is not None:
+        metrics.increment('rows', len(current_batch))
+    return current_batch
+
+def _fetch_page_or_none(session, search_state, page):
+    """Fetch a page, reporting request errors that outlived the retries as None"""
     try:
-        # Get total count first
-        print(f"Getting total count for '{search_query}'...")
-        count_response = session.post(count_endpoint, json=count_payload, timeout=30)
-        print(f"Count API Status: {count_response.status_code}")
+        current_batch = fetch_jobs_page(session, search_state, page)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error on page {page}: {e}")
+        current_batch = None
+    metrics = getattr(session, 'metrics', None)
+    if current_batch is None and metrics is not None:
+        metrics.increment('pages_failed')
+    return current_batch
+
+def iter_unique_jobs(jobs, seen_ids=None):
+    """
+    Yield jobs whose id has not been seen yet, keeping the first occurrence
+    
+    Args:
+        jobs (iterable): Job dictionaries
+        seen_ids (set): Ids already emitted; updated in place (optional)
+    
+    Yields:
+        dict: Jobs in their original order without duplicate ids
+    """
+    if seen_ids is None:
+        seen_ids = set()
+    for job in jobs:
+        job_id = job.get('id') if isinstance(job, dict) else None
+        if job_id is not None:
+            if job_id in seen_ids:
+                continue
+            seen_ids.add(job_id)
+        yield job
+
+def dedupe_jobs(jobs):
+    """
+    Remove duplicate jobs by id, keeping the first occurrence
+    
+    Args:
+        jobs (list): List of job dictionaries
+    
+    Returns:
+        list: Jobs in their original order without duplicate ids
+    """
+    return list(iter_unique_jobs(jobs))
+
+def _iter_pages_sequential(session, search_state, total_jobs, failed_pages, completed_pages):
+    """Yield (page, jobs) one page at a time until a short or empty page"""
+    page = 0
+    while page in completed_pages:
+        page += 1
+    # Pages before the first missing one were full pages in an earlier run
+    jobs_collected = page * PAGE_SIZE
+    
+    while True:
+        if page in completed_pages:
+            current_batch = None
+            jobs_collected += PAGE_SIZE
+        else:
+            current_batch = _fetch_page_or_none(session, search_state, page)
+            
+            if not current_batch:
+                if current_batch is not None:
+                    print("No jobs found in this batch")
+                else:
+                    print(f"Page {page} failed, stopping with the {jobs_collected} jobs collected so far")
+                    failed_pages.append(page)
+                break
+            
+            jobs_collected += len(current_batch)
+            print(f"Total jobs collected so far: {jobs_collected}")
+            yield page, current_batch
         
-        total_jobs = 0
-        if count_response.status_code == 200:
-            try:
-                count_data = count_response.json()
-                print(f"Count response: {count_data}")
-                if isinstance(count_data, dict) and 'total' in count_data:
-                    total_jobs = count_data['total']
-                    print(f"Total jobs available: {total_jobs}")
-            except:
-                print("Count response not JSON:", count_response.text[:200])
+        # Check if we have more pages
+        if ((current_batch is not None and len(current_batch) < PAGE_SIZE)
+                or (total_jobs > 0 and jobs_collected >= total_jobs)):
+            print("Reached end of results")
+            break
         
-        # Scrape jobs with pagination
-        all_jobs = []
-        page = 0
+        page += 1
         
-        while True:
-            print(f"\nGetting page {page} with size 1000...")
-            jobs_payload["page"] = page
-            
-            jobs_response = session.post(jobs_endpoint, json=jobs_payload, timeout=30)
-            print(f"Jobs API Status: {jobs_response.status_code}")
-            
-            if jobs_response.status_code == 200:
-                try:
-                    jobs_data = jobs_response.json()
-                    print(f"Jobs response type: {type(jobs_data)}")
-                    
-                    current_batch = []
-                    
-                    if isinstance(jobs_data, dict):
-                        print(f"Jobs response keys: {list(jobs_data.keys())}")
-                        
-                        # Look for job data in various possible keys
-                        possible_keys = ['results', 'jobs', 'data', 'items', 'content']
-                        for key in possible_keys:
-                            if key in jobs_data and isinstance(jobs_data[key], list):
-                                current_batch = jobs_data[key]
-                                print(f"Found jobs in '{key}': {len(current_batch)} items")
-                                break
-                        
-                        if not current_batch and 'hits' in jobs_data:
-                            # Elasticsearch-style response
-                            hits = jobs_data['hits']
-                            if isinstance(hits, dict) and 'hits' in hits:
-                                current_batch = [hit.get('_source', hit) for hit in hits['hits']]
-                                print(f"Found jobs in Elasticsearch format: {len(current_batch)} items")
-                        
-                    elif isinstance(jobs_data, list):
-                        current_batch = jobs_data
-                        print(f"Got direct list with {len(current_batch)} jobs")
-                    
-                    if not current_batch:
-                        print("No jobs found in this batch")
-                        break
-                    
-                    # Add to our collection
-                    all_jobs.extend(current_batch)
-                    print(f"Total jobs collected so far: {len(all_jobs)}")
-                    
-                    # Check if we have more pages
-                    if len(current_batch) < 1000 or (total_jobs > 0 and len(all_jobs) >= total_jobs):
-                        print("Reached end of results")
-                        break
-                    
-                    page += 1
-                    
-                    # Safety check to avoid infinite loop
-                    if page > 50:  # Max 50 pages
-                        print("Reached maximum page limit")
-                        break
-                        
-                except json.JSONDecodeError:
-                    print("Jobs response not JSON:", jobs_response.text[:200])
+        # Safety check to avoid infinite loop
+        if page > MAX_PAGE:
+            print("Reached maximum page limit")
+            break
+
+def _iter_pages_concurrent(session, search_state, total_jobs, concurrency, failed_pages, completed_pages):
+    """Yield (page, jobs) for every page implied by total_jobs in page order, fetching in parallel"""
+    page_count = min((total_jobs + PAGE_SIZE - 1) // PAGE_SIZE, MAX_PAGE + 1)
+    pages = [page for page in range(page_count) if page not in completed_pages]
+    print(f"Fetching {len(pages)} page(s) with concurrency {concurrency}...")
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Keep at most `concurrency` pages in flight so memory stays bounded
+        pending = deque()
+        remaining = iter(pages)
+        exhausted = False
+        while not exhausted or pending:
+            while not exhausted and len(pending) < concurrency:
+                page = next(remaining, None)
+                if page is None:
+                    exhausted = True
                     break
-            else:
-                print(f"Jobs API failed: {jobs_response.status_code}")
-                print("Error response:", jobs_response.text[:300])
+                pending.append((page, executor.submit(_fetch_page_or_none, session, search_state, page)))
+            
+            if not pending:
                 break
+            page, future = pending.popleft()
+            current_batch = future.result()
+            if current_batch is None:
+                print(f"Page {page} failed, skipping")
+                failed_pages.append(page)
+                continue
+            yield page, current_batch
+
+def iter_numbered_job_pages(session, search_state, concurrency=1, failed_pages=None, completed_pages=(),
+                            total_jobs=None):
+    """
+    Yield (page index, jobs) pairs for a search state as pages arrive
     
-        if all_jobs:
-            print(f"\nSuccessfully scraped {len(all_jobs)} jobs for '{search_query}'")
-            return all_jobs
-        else:
-            print("No jobs found")
-            return []
-            
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        concurrency (int): Number of pages fetched in parallel (default: 1).
+            Values above 1 use the total count to plan the pages up front.
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+        completed_pages (set): Page indexes already fetched by an earlier
+            run; they are not requested again
+        total_jobs (int): Total count if already known; skips the count
+            request (optional)
+    
+    Yields:
+        tuple: (page, jobs) in page order
+    """
+    if failed_pages is None:
+        failed_pages = []
+    
+    # Get total count first
+    if total_jobs is None:
+        print(f"Getting total count for '{search_state.get('searchQuery', '')}'...")
+        total_jobs = get_total_count(session, search_state)
+    
+    # Scrape jobs with pagination
+    if concurrency > 1 and total_jobs > 0:
+        yield from _iter_pages_concurrent(session, search_state, total_jobs, concurrency,
+                                          failed_pages, completed_pages)
+    else:
+        yield from _iter_pages_sequential(session, search_state, total_jobs, failed_pages, completed_pages)
+
+def iter_job_pages(session, search_state, concurrency=1, failed_pages=None, total_jobs=None):
+    """
+    Yield pages of jobs for a search state as they arrive
+    
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        concurrency (int): Number of pages fetched in parallel (default: 1).
+            Values above 1 use the total count to plan the pages up front.
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+        total_jobs (int): Total count if already known (optional)
+    
+    Yields:
+        list: Jobs on each page, in page order
+    """
+    pages = iter_numbered_job_pages(session, search_state, concurrency, failed_pages, total_jobs=total_jobs)
+    for _, current_batch in pages:
+        yield current_batch
+
+def warn_failed_pages(failed_pages):
+    """Print the warning for a scrape that is missing pages"""
+    pages = [page for page in failed_pages if page is not None]
+    if pages:
+        print(f"Warning: page(s) {pages} failed after retries; keeping partial results")
+    else:
+        print("Warning: scrape stopped early after a request error; keeping partial results")
+
+def iter_jobs_with_session(session, search_state, concurrency=1, failed_pages=None):
+    """
+    Yield unique jobs for a search state page by page
+    
+    Only the pages currently being fetched are kept in memory, plus the set
+    of job ids already yielded.
+    
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        concurrency (int): Number of pages fetched in parallel (default: 1)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+    
+    Yields:
+        dict: Job dictionaries without duplicate ids
+    """
+    seen_ids = set()
+    for current_batch in iter_job_pages(session, search_state, concurrency, failed_pages):
+        yield from iter_unique_jobs(current_batch, seen_ids)
+
+def scrape_with_session(session, search_state, concurrency=1, total_jobs=None, failed_pages=None):
+    """
+    Scrape all pages for a search state using an existing session
+    
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        concurrency (int): Number of pages fetched in parallel (default: 1).
+            Values above 1 use the total count to plan the pages up front.
+        total_jobs (int): Total count if already known (optional)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it (None for a failed count request)
+    
+    Returns:
+        list: List of job dictionaries, possibly partial if some pages
+            failed, or empty list if nothing could be scraped
+    """
+    search_query = search_state.get('searchQuery', '')
+    all_jobs = []
+    if failed_pages is None:
+        failed_pages = []
+    
+    try:
+        for current_batch in iter_job_pages(session, search_state, concurrency, failed_pages, total_jobs):
+            with _stage(session, 'extend'):
+                all_jobs.extend(current_batch)
     except requests.exceptions.RequestException as e:
         print(f"Request error: {e}")
+        failed_pages.append(None)
+    
+    all_jobs = dedupe_jobs(all_jobs)
+    
+    if failed_pages:
+        warn_failed_pages(failed_pages)
+    
+    if all_jobs:
+        print(f"\nSuccessfully scraped {len(all_jobs)} jobs for '{search_query}'")
+        return all_jobs
+    else:
+        print("No jobs found")
         return []
 
+def plan_shards(session, search_state, max_results=MAX_RESULTS, dimensions=SHARD_DIMENSIONS):
+    """
+    Split a search state into shards that each fit under the pagination cap
+    
+    The total count of the search state is checked first. If it is above
+    max_results, the first dimension in `dimensions` that still lists more
+    than one value is split in half and each half is planned recursively.
+    The filters are ORed by the API, so the shards together cover the
+    original query (jobs matching several shards are removed by the caller).
+    
+    Args:
+        session (requests.Session): Session used for the count requests
+        search_state (dict): Search state to split
+        max_results (int): Most results one shard may have (default: the
+            MAX_PAGE pagination cap)
+        dimensions (list): List-valued search state keys to split on, in order
+    
+    Returns:
+        list: (search_state, total_jobs) pairs, one per shard
+    """
+    total_jobs = get_total_count(session, search_state)
+    if total_jobs <= max_results:
+        return [(search_state, total_jobs)]
+    
+    for dimension in dimensions:
+        values = search_state.get(dimension)
+        if isinstance(values, list) and len(values) > 1:
+            middle = len(values) // 2
+            print(f"{total_jobs} results is over the {max_results} cap, splitting on {dimension}")
+            shards = []
+            for part in (values[:middle], values[middle:]):
+                shards.extend(plan_shards(session, dict(search_state, **{dimension: part}),
+                                          max_results, dimensions))
+            return shards
+    
+    print(f"Warning: shard with {total_jobs} results cannot be split further; "
+          f"only the first {max_results} will be fetched")
+    return [(search_state, total_jobs)]
+
+def scrape_sharded_with_session(session, search_state, workers=1, concurrency=1, failed_pages=None):
+    """
+    Scrape a search state in shards so results past the page cap are covered
+    
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        workers (int): Number of shards scraped at the same time (default: 1)
+        concurrency (int): Pages fetched in parallel per shard (default: 1)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched in any shard are appended to it
+    
+    Returns:
+        list: Jobs from every shard, in shard order, de-duplicated by id
+    """
+    print(f"Planning shards for '{search_state.get('searchQuery', '')}'...")
+    shards = plan_shards(session, search_state)
+    print(f"Scraping {len(shards)} shard(s) covering "
+          f"{sum(total_jobs for _, total_jobs in shards)} results (before de-duplication)")
+    
+    def scrape(shard):
+        shard_state, total_jobs = shard
+        # Each shard warns about its own pages only
+        shard_failed_pages = []
+        jobs = scrape_with_session(session, shard_state, concurrency, total_jobs, shard_failed_pages)
+        if failed_pages is not None:
+            failed_pages.extend(shard_failed_pages)
+        return jobs
+    
+    all_jobs = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for jobs in executor.map(scrape, shards):
+            all_jobs.extend(jobs)
+    
+    return dedupe_jobs(all_jobs)
+
+def iter_sharded_jobs_with_session(session, search_state, concurrency=1, failed_pages=None):
+    """
+    Yield unique jobs for a search state shard by shard
+    
+    Streaming counterpart of scrape_sharded_with_session(): shards are
+    fetched one after the other, so only the pages in flight and the set of
+    job ids already yielded are kept in memory.
+    
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        concurrency (int): Pages fetched in parallel per shard (default: 1)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+    
+    Yields:
+        dict: Job dictionaries without duplicate ids
+    """
+    print(f"Planning shards for '{search_state.get('searchQuery', '')}'...")
+    shards = plan_shards(session, search_state)
+    print(f"Scraping {len(shards)} shard(s) covering "
+          f"{sum(total_jobs for _, total_jobs in shards)} results (before de-duplication)")
+    
+    seen_ids = set()
+    for shard_state, total_jobs in shards:
+        for current_batch in iter_job_pages(session, shard_state, concurrency, failed_pages, total_jobs):
+            yield from iter_unique_jobs(current_batch, seen_ids)
+
+def scrape_sharded(search_query, workers=4, concurrency=1, session=None, failed_pages=None):
+    """
+    Scrape every job for a query, sharding it if it exceeds the page cap
+    
+    Args:
+        search_query (str): The search term for job listings
+        workers (int): Number of shards scraped at the same time (default: 4)
+        concurrency (int): Pages fetched in parallel per shard (default: 1)
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it (None for a failed count request)
+    
+    Returns:
+        list: List of job dictionaries or empty list if failed
+    """
+    search_state = build_search_state(search_query)
+    
+    with _session_scope(session, max(workers * concurrency, 1)) as session:
+        try:
+            all_jobs = scrape_sharded_with_session(session, search_state, workers, concurrency, failed_pages)
+        except requests.exceptions.RequestException as e:
+            print(f"Request error: {e}")
+            if failed_pages is not None:
+                failed_pages.append(None)
+            return []
+    
+    print(f"\nSuccessfully scraped {len(all_jobs)} unique jobs for '{search_query}'")
+    return all_jobs
+
+def iter_hiring_cafe_jobs(search_query, concurrency=1, session=None, shard=False, failed_pages=None):
+    """
+    Yield job listings from hiring.cafe page by page
+    
+    Streaming counterpart of scrape_hiring_cafe_jobs(): peak memory stays at
+    about one page (times concurrency) however many jobs match. Request
+    errors are raised to the caller once the jobs fetched so far are yielded.
+    
+    Args:
+        search_query (str): The search term for job listings
+        concurrency (int): Number of pages fetched in parallel (default: 1)
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        shard (bool): Split a query above the page cap into shards, fetched
+            one after the other (default: False)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+    
+    Yields:
+        dict: Job dictionaries without duplicate ids
+    """
+    search_state = build_search_state(search_query)
+    
+    with _session_scope(session, max(concurrency, 1)) as session:
+        if shard:
+            yield from iter_sharded_jobs_with_session(session, search_state, concurrency, failed_pages)
+        else:
+            yield from iter_jobs_with_session(session, search_state, concurrency, failed_pages)
+
+def scrape_hiring_cafe_jobs(search_query, concurrency=1, session=None, failed_pages=None):
+    """
+    Scrape job listings from hiring.cafe API based on search query
+    
+    Args:
+        search_query (str): The search term for job listings
+        concurrency (int): Number of pages fetched in parallel (default: 1).
+            Values above 1 use the total count to plan the pages up front.
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+    
+    Returns:
+        list: List of job dictionaries or empty list if failed
+    """
+    search_state = build_search_state(search_query)
+    
+    with _session_scope(session, max(concurrency, 1)) as session:
+        return scrape_with_session(session, search_state, concurrency, failed_pages=failed_pages)
+
+def iter_job_delta(session, search_state, index, concurrency=1, stop_when_known=False, failed_pages=None):
+    """
+    Yield only the jobs that changed since the last run of a search state
+    
+    Each page is checked against the local job index as it arrives. New and
+    changed jobs are yielded with a 'change_type' of 'new' or 'changed'.
+    After a complete run, jobs the index knew about but the API no longer
+    returned are yielded as {'id': ..., 'change_type': 'removed'}. That
+    check is skipped when the query has more results than the page cap,
+    since the jobs past it are never fetched.
+    
+    Args:
+        session (requests.Session): Session used for every request
+        search_state (dict): Search state to scrape
+        index (sqlite3.Connection): Job index from job_index.open_job_index()
+        concurrency (int): Number of pages fetched in parallel (default: 1)
+        stop_when_known (bool): Stop paging at the first page whose jobs are
+            all known and unchanged. Only use with a newest-first sortBy;
+            removed jobs are not reported when the run stops early.
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it
+    
+    Yields:
+        dict: Delta records
+    """
+    query = search_state.get('searchQuery', '')
+    run_started = time.time()
+    if failed_pages is None:
+        failed_pages = []
+    failures_before = len(failed_pages)
+    seen_ids = set()
+    stopped_early = False
+    
+    print(f"Getting total count for '{query}'...")
+    total_jobs = get_total_count(session, search_state)
+    pages_fetched = 0
+    
+    for current_batch in iter_job_pages(session, search_state, concurrency, failed_pages, total_jobs):
+        pages_fetched += 1
+        changes = record_jobs(index, query, iter_unique_jobs(current_batch, seen_ids), run_started)
+        for change, job in changes:
+            if change != 'unchanged':
+                yield dict(job, change_type=change)
+        
+        if stop_when_known and changes and all(change == 'unchanged' for change, _ in changes):
+            print("Page contains only known jobs, stopping early")
+            stopped_early = True
+            break
+    
+    if stopped_early or len(failed_pages) > failures_before:
+        print("Run incomplete, not checking for removed jobs")
+        return
+    if total_jobs > MAX_RESULTS or (not total_jobs and pages_fetched > MAX_PAGE):
+        print(f"Results past the {MAX_RESULTS} cap were not fetched, not checking for removed jobs")
+        return
+    
+    for job_id in pop_disappeared_jobs(index, query, run_started):
+        yield {'id': job_id, 'change_type': 'removed'}
+
+def scrape_job_delta(search_query, index_file, delta_file, concurrency=1, stop_when_known=False,
+                     sort_by=None, session=None, failed_pages=None):
+    """
+    Scrape a query incrementally and write only the changes to a delta file
+    
+    Args:
+        search_query (str): The search term for job listings
+        index_file (str): SQLite job index, created on first use
+        delta_file (str): Output NDJSON file (.gz/.zst are compressed)
+        concurrency (int): Number of pages fetched in parallel (default: 1)
+        stop_when_known (bool): Stop at the first fully known page
+        sort_by (str): Value for the search state's sortBy (optional)
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it (None for a request error that
+            stopped the run)
+    
+    Returns:
+        dict: Number of 'new', 'changed' and 'removed' records written
+    """
+    search_state = build_search_state(search_query)
+    if sort_by:
+        search_state['sortBy'] = sort_by
+    
+    counts = {'new': 0, 'changed': 0, 'removed': 0}
+    if failed_pages is None:
+        failed_pages = []
+    
+    def counted(records):
+        for record in records:
+            counts[record['change_type']] += 1
+            yield record
+    
+    index = open_job_index(index_file)
+    try:
+        with _session_scope(session, max(concurrency, 1)) as session:
+            delta = iter_job_delta(session, search_state, index, concurrency, stop_when_known, failed_pages)
+            write_jobs_ndjson(counted(delta), delta_file)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        failed_pages.append(None)
+    finally:
+        index.close()
+    
+    if failed_pages:
+        warn_failed_pages(failed_pages)
+    print(f"Delta for '{search_query}': {counts['new']} new, {counts['changed']} changed, "
+          f"{counts['removed']} removed -> {delta_file}")
+    return counts
+
+def load_queries(filename):
+    """
+    Load search queries from a text file, one per line
+    
+    Blank lines and lines starting with '#' are ignored, as are repeats.
+    
+    Args:
+        filename (str): Path to the queries file
+    
+    Returns:
+        list: Search queries in file order
+    """
+    queries = []
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith('#') and query not in queries:
+                queries.append(query)
+    return queries
+
+def scrape_queries(queries, workers=4, concurrency=1, session=None, shard=False, failed_pages=None):
+    """
+    Scrape several search queries over one shared session
+    
+    Queries run on a bounded worker pool. Results are merged by job id and
+    every job gets a 'matched_queries' list naming the queries that found it.
+    
+    Args:
+        queries (list): Search terms to scrape
+        workers (int): Number of queries scraped at the same time (default: 4)
+        concurrency (int): Pages fetched in parallel per query (default: 1)
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        shard (bool): Split queries above the page cap into shards (default: False)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched for any query are appended to it (None for a query
+            stopped by a request error)
+    
+    Returns:
+        list: Merged job dictionaries, in query order then page order
+    """
+    # The default filters are shared by every query; only the search term differs
+    base_state = build_search_state("")
+    
+    merged_jobs = {}
+    unkeyed_jobs = []
+    with _session_scope(session, max(workers * concurrency, 1)) as session:
+        def scrape(query):
+            search_state = dict(base_state, searchQuery=query)
+            # Each query warns about its own pages only
+            query_failed_pages = []
+            if shard:
+                try:
+                    jobs = scrape_sharded_with_session(session, search_state, 1, concurrency, query_failed_pages)
+                except requests.exceptions.RequestException as e:
+                    print(f"Request error: {e}")
+                    query_failed_pages.append(None)
+                    jobs = []
+            else:
+                jobs = scrape_with_session(session, search_state, concurrency, failed_pages=query_failed_pages)
+            if failed_pages is not None:
+                failed_pages.extend(query_failed_pages)
+            return jobs
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for query, jobs in zip(queries, executor.map(scrape, queries)):
+                print(f"Query '{query}': {len(jobs)} jobs")
+                for job in jobs:
+                    job_id = job.get('id') if isinstance(job, dict) else None
+                    if job_id is None:
+                        unkeyed_jobs.append(job)
+                        continue
+                    if job_id not in merged_jobs:
+                        job['matched_queries'] = []
+                        merged_jobs[job_id] = job
+                    merged_jobs[job_id]['matched_queries'].append(query)
+    
+    all_jobs = list(merged_jobs.values()) + unkeyed_jobs
+    print(f"\nMerged {len(all_jobs)} unique jobs from {len(queries)} queries")
+    return all_jobs
+
 def save_jobs_to_json(jobs, filename):
     """
     Save job data to JSON file
@@ -271,17 +983,276 @@ def save_jobs_to_json(jobs, filename):
     else:
         print("No jobs to save")
 
-if __name__ == "__main__":
-    # Example usage
-    search_term = input("Enter search term (e.g., 'Data Scientist', 'Software Engineer'): ")
+def stream_jobs_to_ndjson(search_query, filename, concurrency=1, session=None, shard=False, failed_pages=None):
+    """
+    Scrape jobs and write them to a newline-delimited JSON file as they arrive
+    
+    Args:
+        search_query (str): The search term for job listings
+        filename (str): Output filename (.gz/.zst are compressed)
+        concurrency (int): Number of pages fetched in parallel (default: 1)
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        shard (bool): Split a query above the page cap into shards (default: False)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it (None for a request error that
+            stopped the scrape)
+    
+    Returns:
+        int: Number of jobs written
+    """
+    written = 0
+    if failed_pages is None:
+        failed_pages = []
+    
+    def counted(jobs):
+        nonlocal written
+        for job in jobs:
+            written += 1
+            yield job
+    
+    try:
+        write_jobs_ndjson(counted(iter_hiring_cafe_jobs(search_query, concurrency, session, shard, failed_pages)),
+                          filename)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        failed_pages.append(None)
+    
+    if failed_pages:
+        warn_failed_pages(failed_pages)
+    print(f"Saved {written} jobs to {filename}")
+    return written
+
+def scrape_with_checkpoint(search_query, filename, checkpoint_file=None, concurrency=1,
+                           resume=False, session=None, failed_pages=None):
+    """
+    Scrape jobs to an NDJSON file, checkpointing after every page
+    
+    The checkpoint records the query fingerprint, the pages completed and the
+    job ids already written. With resume=True and a checkpoint for the same
+    search state, only the missing pages are fetched and new jobs are
+    appended to the existing output. For plain files the checkpoint also
+    records the output size, and resuming truncates the file to it, so a
+    partial line or a page written after the last checkpoint is dropped and
+    that page is fetched again. Compressed files are instead cut back to
+    their last complete job, and the ids already written are read from them.
     
-    # Scrape jobs
-    jobs = scrape_hiring_cafe_jobs(search_term)
+    Args:
+        search_query (str): The search term for job listings
+        filename (str): Output NDJSON filename (.gz/.zst are compressed)
+        checkpoint_file (str): Checkpoint path (default: filename + '.checkpoint.json')
+        concurrency (int): Number of pages fetched in parallel (default: 1)
+        resume (bool): Continue from an existing checkpoint (default: False)
+        session (requests.Session): Session from create_session() to use
+            instead of a new one (optional)
+        failed_pages (list): If given, indexes of pages that could not be
+            fetched are appended to it (None for a request error that
+            stopped the scrape); the run then needs another resume
+    
+    Returns:
+        int: Number of jobs written in this run
+    """
+    search_state = build_search_state(search_query)
+    fingerprint = search_state_fingerprint(search_state)
+    checkpoint_file = checkpoint_file or f"{filename}.checkpoint.json"
+    
+    checkpoint = load_checkpoint(checkpoint_file) if resume else None
+    if checkpoint is not None and (checkpoint.get('fingerprint') != fingerprint
+                                   or checkpoint.get('output') != filename
+                                   or not os.path.exists(filename)):
+        print(f"Checkpoint {checkpoint_file} does not match this query/output, starting over")
+        checkpoint = None
+    
+    if checkpoint is None:
+        checkpoint = {'query': search_query, 'fingerprint': fingerprint, 'output': filename,
+                      'pages_completed': [], 'job_ids': [], 'complete': False}
+        # Start a fresh output file
+        write_jobs_ndjson([], filename)
+    elif checkpoint.get('complete'):
+        print(f"Checkpoint {checkpoint_file} is already complete, nothing to resume")
+        return 0
+    else:
+        # Drop whatever was written after the last checkpoint
+        job_ids = recover_ndjson_output(filename, checkpoint.get('output_bytes'))
+        if job_ids is not None:
+            checkpoint['job_ids'] = job_ids
+        print(f"Resuming '{search_query}': {len(checkpoint['pages_completed'])} page(s) and "
+              f"{len(checkpoint['job_ids'])} jobs already saved")
+    
+    track_offset = not filename.endswith(COMPRESSED_EXTENSIONS)
+    if track_offset:
+        checkpoint['output_bytes'] = os.path.getsize(filename)
+    
+    completed_pages = set(checkpoint['pages_completed'])
+    seen_ids = set(checkpoint['job_ids'])
+    if failed_pages is None:
+        failed_pages = []
+    written = 0
+    save_checkpoint(checkpoint_file, checkpoint)
+    
+    try:
+        with _session_scope(session, max(concurrency, 1)) as session:
+            pages = iter_numbered_job_pages(session, search_state, concurrency, failed_pages, completed_pages)
+            for page, current_batch in pages:
+                new_jobs = list(iter_unique_jobs(current_batch, seen_ids))
+                written += write_jobs_ndjson(new_jobs, filename, append=True)
+                
+                checkpoint['pages_completed'].append(page)
+                checkpoint['job_ids'].extend(job['id'] for job in new_jobs
+                                             if isinstance(job, dict) and 'id' in job)
+                if track_offset:
+                    checkpoint['output_bytes'] = os.path.getsize(filename)
+                save_checkpoint(checkpoint_file, checkpoint)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        failed_pages.append(None)
+    
+    if failed_pages:
+        print("Scrape incomplete; run again with --resume to fetch the missing pages")
+    else:
+        checkpoint['complete'] = True
+        save_checkpoint(checkpoint_file, checkpoint)
+    
+    print(f"Saved {written} jobs to {filename}")
+    return written
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the scraper"""
+    parser = argparse.ArgumentParser(description="Scrape job listings from hiring.cafe")
+    parser.add_argument('query', nargs='?', help="Search term (prompted for if omitted)")
+    parser.add_argument('--queries-file', help="File with one search term per line (batch mode)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Queries (batch mode) or shards (--shard) scraped at the same time (default: 4)")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="Pages fetched in parallel per query (default: 1)")
+    parser.add_argument('--shard', action='store_true',
+                        help="Split queries with more results than the page cap into shards "
+                             "(by workplace type, commitment, seniority and role type)")
+    parser.add_argument('--index', help="SQLite job index; enables incremental mode, which writes only "
+                                        "new, changed and removed jobs")
+    parser.add_argument('--stop-when-known', action='store_true',
+                        help="In incremental mode, stop at the first page with only known jobs "
+                             "(requires a newest-first --sort-by)")
+    parser.add_argument('--sort-by', help="sortBy value sent to the API (default: 'default')")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted NDJSON scrape from its checkpoint")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument('--rate', type=float,
+                        help="Maximum requests per second (default: unlimited)")
+    parser.add_argument('--retries', type=int, default=3,
+                        help="Retries per request on 429/5xx and connection errors (default: 3)")
+    parser.add_argument('--cache-dir', help="Cache API responses in this directory")
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help="Seconds a cached response is reused without revalidation (default: 3600)")
+    parser.add_argument('--cache-max-mb', type=float, default=500,
+                        help="Maximum cache size in MB before old entries are evicted (default: 500)")
+    parser.add_argument('--interactions', choices=INTERACTION_MODES, default='keep',
+                        help="Store user interaction lists as returned (keep), as counts (count) "
+                             "or as sorted user ids (ids) (default: keep)")
+    parser.add_argument('--drop-field', action='append', default=[], metavar='PATH',
+                        help="Drop a field from every job, as a dotted path like "
+                             "job_information.description (repeatable)")
+    parser.add_argument('--metrics-json', help="Write a JSON run report (stage timings, bytes, retries, "
+                                               "rows/s, slowest pages) to this file")
+    parser.add_argument('--metrics-prom', help="Write run metrics in Prometheus text format to this file")
+    parser.add_argument('-o', '--output', help="Output filename; .ndjson/.jsonl (optionally .gz/.zst) streams jobs as they arrive")
+    return parser.parse_args(argv)
+
+def main(argv=None, interactive=True):
+    """
+    Run the scraper command line
+    
+    Args:
+        argv (list): Arguments (default: sys.argv[1:])
+        interactive (bool): Prompt for a missing search term instead of
+            failing (default: True)
+    """
+    args = parse_args(argv)
+    if not args.query and not args.queries_file and not interactive:
+        raise SystemExit("error: a search term or --queries-file is required")
+    
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl,
+                              max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    pool_size = max(args.workers * args.concurrency if args.queries_file or args.shard else args.concurrency, 1)
+    projection = None
+    if args.interactions != 'keep' or args.drop_field:
+        projection = JobProjection(interactions=args.interactions, drop_fields=args.drop_field)
+    metrics = None
+    if args.metrics_json or args.metrics_prom:
+        metrics = RunMetrics('scrape')
+        # Written on every exit path, including early SystemExit
+        atexit.register(write_run_metrics, metrics, args.metrics_json, args.metrics_prom)
+    session = create_session(pool_size=pool_size, cache=cache,
+                             requests_per_second=args.rate, retries=args.retries,
+                             projection=projection, metrics=metrics)
+    failed_pages = []
+    
+    if args.queries_file:
+        # Batch mode
+        queries = load_queries(args.queries_file)
+        print(f"Loaded {len(queries)} queries from {args.queries_file}")
+        jobs = scrape_queries(queries, workers=args.workers, concurrency=args.concurrency,
+                              session=session, shard=args.shard, failed_pages=failed_pages)
+        search_term = f"{len(queries)} queries"
+        filename = args.output or "batch_jobs.json"
+    else:
+        search_term = args.query or input("Enter search term (e.g., 'Data Scientist', 'Software Engineer'): ")
+        filename = args.output or f"{search_term.lower().replace(' ', '_')}_jobs.json"
+        
+        if args.shard and (args.index or args.resume or args.checkpoint):
+            # These modes track one page sequence per query; shards would be mixed up
+            print("--shard cannot be combined with --index, --resume or --checkpoint")
+            raise SystemExit(2)
+        
+        if args.index:
+            # Incremental mode: only the delta since the last run is written
+            delta_file = args.output or f"{search_term.lower().replace(' ', '_')}_delta.ndjson"
+            scrape_job_delta(search_term, args.index, delta_file, concurrency=args.concurrency,
+                             stop_when_known=args.stop_when_known, sort_by=args.sort_by,
+                             session=session, failed_pages=failed_pages)
+            raise SystemExit(1 if failed_pages else 0)
+        
+        if args.resume or args.checkpoint:
+            if not is_ndjson_filename(filename):
+                print("Checkpointing needs NDJSON output, e.g. -o jobs.ndjson")
+                raise SystemExit(2)
+            written = scrape_with_checkpoint(search_term, filename, checkpoint_file=args.checkpoint,
+                                             concurrency=args.concurrency, resume=args.resume,
+                                             session=session, failed_pages=failed_pages)
+            if failed_pages:
+                print(f"\nScraping incomplete! Wrote {written} jobs for '{search_term}' to {filename}")
+                raise SystemExit(1)
+            print(f"\nScraping finished! Wrote {written} jobs for '{search_term}' to {filename}")
+            # A resume may write nothing new; only an output without any job is a failure
+            raise SystemExit(0 if written or next(iter_jobs_from_file(filename), None) is not None else 1)
+        
+        if is_ndjson_filename(filename):
+            # Stream pages straight to disk instead of collecting them in memory
+            written = stream_jobs_to_ndjson(search_term, filename, concurrency=args.concurrency,
+                                            session=session, shard=args.shard, failed_pages=failed_pages)
+            if failed_pages:
+                print(f"\nScraping incomplete! Streamed {written} jobs for '{search_term}' to {filename}")
+                raise SystemExit(1)
+            print(f"\nScraping completed! Streamed {written} jobs for '{search_term}' to {filename}")
+            raise SystemExit(0 if written else 1)
+        
+        # Scrape jobs
+        if args.shard:
+            jobs = scrape_sharded(search_term, workers=args.workers, concurrency=args.concurrency,
+                                  session=session, failed_pages=failed_pages)
+        else:
+            jobs = scrape_hiring_cafe_jobs(search_term, concurrency=args.concurrency, session=session,
+                                           failed_pages=failed_pages)
     
     if jobs:
         # Save to JSON file
-        filename = f"{search_term.lower().replace(' ', '_')}_jobs.json"
-        save_jobs_to_json(jobs, filename)
+        if is_ndjson_filename(filename):
+            write_jobs_ndjson(jobs, filename)
+            print(f"Saved {len(jobs)} jobs to {filename}")
+        else:
+            save_jobs_to_json(jobs, filename)
         
         print(f"\nScraping completed! Found {len(jobs)} jobs for '{search_term}'")
         print(f"Data saved to: {filename}")
@@ -290,5 +1261,13 @@ if __name__ == "__main__":
         if len(jobs) > 0 and isinstance(jobs[0], dict):
             sample_keys = list(jobs[0].keys())
             print(f"Job data includes: {', '.join(sample_keys[:10])}")
+        
+        if failed_pages:
+            print("Some pages could not be fetched; the saved results are incomplete")
+            raise SystemExit(1)
     else:
-        print("Scraping unsuccessful. No jobs were found.")
\ No newline at end of file
+        print("Scraping unsuccessful. No jobs were found.")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+
+from excel_converter import iter_flattened_jobs
+from job_io import iter_jobs_from_file, strip_compression_extension
+
+# Flattened fields stored for every job, in table column order
+JOB_FIELDS = ('id', 'title', 'description', 'source', 'board_token', 'source_and_board_token', 'apply_url',
+              'viewed_count', 'applied_count', 'saved_count', 'hidden_count')
+
+# bm25() weights of the indexed columns: title, description, source
+RANK_WEIGHTS = (10.0, 1.0, 2.0)
+
+# Result orderings: ranked by relevance, or by an interaction count or recency
+SORT_ORDERS = {
+    'rank': 'score',
+    'views': 'j.viewed_count DESC',
+    'applications': 'j.applied_count DESC',
+    'saves': 'j.saved_count DESC',
+    'newest': 'j.first_indexed DESC',
+}
+
+# Jobs written per transaction while indexing
+COMMIT_EVERY = 10000
+
+# Parts of the sqlite3 errors raised for a MATCH query SQLite cannot parse,
+# e.g. 'c++', 'foo"', 'nocol:x' or '*'
+FTS_QUERY_ERRORS = ('fts5', 'syntax error', 'unterminated string', 'no such column',
+                    'unknown special query', 'expected integer')
+
+def open_search_index(filename):
+    """
+    Open (or create) the full-text search index of scraped jobs
+
+    Jobs are stored once per id in a plain table; an external-content FTS5
+    table over title, cleaned description and source is kept in sync by
+    triggers, so only inserted or changed jobs are re-tokenized.
+
+    Args:
+        filename (str): Path to the SQLite database file
+
+    Returns:
+        sqlite3.Connection: Open connection to the index
+    """
+    conn = sqlite3.connect(filename)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            doc INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            source TEXT NOT NULL,
+            board_token TEXT NOT NULL,
+            source_and_board_token TEXT NOT NULL,
+            apply_url TEXT NOT NULL,
+            viewed_count INTEGER NOT NULL,
+            applied_count INTEGER NOT NULL,
+            saved_count INTEGER NOT NULL,
+            hidden_count INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            first_indexed REAL NOT NULL,
+            last_indexed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_source ON jobs (source);
+        CREATE INDEX IF NOT EXISTS jobs_board_token ON jobs (board_token);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5 (
+            title, description, source,
+            content = 'jobs', content_rowid = 'doc', tokenize = 'porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, description, source)
+            VALUES (new.doc, new.title, new.description, new.source);
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, description, source)
+            VALUES ('delete', old.doc, old.title, old.description, old.source);
+        END;
+        -- Re-created on open so indexes made before the WHEN clause get it;
+        -- updates that only change the counts leave the FTS index alone
+        DROP TRIGGER IF EXISTS jobs_fts_update;
+        CREATE TRIGGER jobs_fts_update AFTER UPDATE OF title, description, source ON jobs
+        WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+             OR old.source IS NOT new.source BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, description, source)
+            VALUES ('delete', old.doc, old.title, old.description, old.source);
+            INSERT INTO jobs_fts (rowid, title, description, source)
+            VALUES (new.doc, new.title, new.description, new.source);
+        END;
+
+        CREATE TABLE IF NOT EXISTS indexed_files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            jobs INTEGER NOT NULL,
+            indexed_at REAL NOT NULL
+        );
+    ''')
+    conn.commit()
+    return conn
+
+def _row_hash(row):
+    """Hash of the indexed fields, so unchanged jobs are not rewritten"""
+    encoded = '\x1f'.join(str(value) for value in row)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def _job_row(flattened):
+    flattened = dict(flattened, description=flattened.get('description_clean'))
+    return tuple(flattened.get(field) or (0 if field.endswith('_count') else '') for field in JOB_FIELDS)
+
+def index_jobs(conn, jobs, workers=1):
+    """
+    Add jobs to the search index, updating the ones whose content changed
+
+    Args:
+        conn (sqlite3.Connection): Open search index
+        jobs (iterable): Job dictionaries as returned by the API
+        workers (int): Processes used to clean descriptions (default: 1)
+
+    Returns:
+        dict: 'jobs' read, 'new', 'changed' and 'unchanged' counts
+    """
+    indexed_at = time.time()
+    before = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+    stats = {'jobs': 0, 'new': 0, 'changed': 0, 'unchanged': 0}
+    written = 0
+
+    # Text nodes are joined with spaces so '<li>Python</li><li>SQL</li>'
+    # indexes two words rather than 'PythonSQL'
+    for flattened in iter_flattened_jobs(jobs, workers=workers, separator=' '):
+        if flattened is None or not flattened.get('id'):
+            continue
+        row = _job_row(flattened)
+        cursor = conn.execute(f'''
+            INSERT INTO jobs ({', '.join(JOB_FIELDS)}, content_hash, first_indexed, last_indexed)
+            VALUES ({', '.join('?' * len(JOB_FIELDS))}, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                {', '.join(f'{field} = excluded.{field}' for field in JOB_FIELDS[1:])},
+                content_hash = excluded.content_hash,
+                last_indexed = excluded.last_indexed
+            WHERE content_hash != excluded.content_hash
+        ''', row + (_row_hash(row), indexed_at, indexed_at))
+        stats['jobs'] += 1
+        written += cursor.rowcount
+        if stats['jobs'] % COMMIT_EVERY == 0:
+            conn.commit()
+    conn.commit()
+
+    stats['new'] = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] - before
+    stats['changed'] = written - stats['new']
+    stats['unchanged'] = stats['jobs'] - written
+    return stats
+
+def _is_job_file(filename):
+    return strip_compression_extension(filename).endswith(('.json', '.ndjson', '.jsonl'))
+
+def find_job_files(paths):
+    """
+    Expand files and directories into the job files they contain
+
+    Args:
+        paths (list): Job files or directories (searched recursively)
+
+    Returns:
+        list: Job file paths, sorted within each directory
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for directory, _, names in sorted(os.walk(path)):
+            files.extend(os.path.join(directory, name) for name in sorted(names) if _is_job_file(name))
+    return files
+
+def index_job_files(conn, paths, workers=1, force=False):
+    """
+    Index job files, skipping the ones already indexed and unchanged since
+
+    A file counts as unchanged while its size and modification time are the
+    same as when it was last indexed; growing NDJSON files from streaming
+    scrapes are indexed again, which only rewrites the jobs that changed.
+
+    Args:
+        conn (sqlite3.Connection): Open search index
+        paths (list): Job files or directories of job files
+        workers (int): Processes used to clean descriptions (default: 1)
+        force (bool): Index files even if they look unchanged (default: False)
+
+    Returns:
+        dict: Totals of 'files', 'skipped_files' and the index_jobs() counts
+    """
+    totals = {'files': 0, 'skipped_files': 0, 'jobs': 0, 'new': 0, 'changed': 0, 'unchanged': 0}
+    for filename in find_job_files(paths):
+        path = os.path.abspath(filename)
+        status = os.stat(path)
+        row = conn.execute('SELECT size, mtime FROM indexed_files WHERE path = ?', (path,)).fetchone()
+        if not force and row is not None and row['size'] == status.st_size and row['mtime'] == status.st_mtime:
+            totals['skipped_files'] += 1
+            continue
+
+        print(f"Indexing {filename}...")
+        stats = index_jobs(conn, iter_jobs_from_file(filename), workers=workers)
+        conn.execute('INSERT OR REPLACE INTO indexed_files (path, size, mtime, jobs, indexed_at) '
+                     'VALUES (?, ?, ?, ?, ?)', (path, status.st_size, status.st_mtime, stats['jobs'], time.time()))
+        conn.commit()
+        print(f"  {stats['jobs']} jobs: {stats['new']} new, {stats['changed']} changed, "
+              f"{stats['unchanged']} unchanged")
+
+        totals['files'] += 1
+        for key in ('jobs', 'new', 'changed', 'unchanged'):
+            totals[key] += stats[key]
+    return totals
+
+def optimize_index(conn):
+    """Merge the FTS segments left by incremental updates into one"""
+    conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+    conn.commit()
+
+def quote_terms(query):
+    """Turn free text into an FTS5 query matching every word literally"""
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+def search_jobs(conn, query=None, source=None, company=None, min_views=0, min_applications=0,
+                sort='rank', limit=20):
+    """
+    Ranked keyword search with filters
+
+    Args:
+        conn (sqlite3.Connection): Open search index
+        query (str): FTS5 query, e.g. 'python remote', '"machine learning"',
+            'title:engineer NOT senior' (optional; without it all jobs match).
+            Text that is not valid FTS5 syntax, such as 'c++' or 'foo"', is
+            searched for word by word
+        source (str): Only jobs from this source (optional)
+        company (str): Only jobs with this board token (optional)
+        min_views (int): Minimum viewed count (default: 0)
+        min_applications (int): Minimum applied count (default: 0)
+        sort (str): One of SORT_ORDERS (default: 'rank', best match first;
+            without a query, most viewed first)
+        limit (int): Maximum number of results (default: 20)
+
+    Returns:
+        list: Result dictionaries with the stored job fields, 'score'
+            (bm25, lower is better) and a description 'snippet'
+
+    Raises:
+        ValueError: If the sort order or the query syntax is invalid
+        sqlite3.OperationalError: For database errors, e.g. a locked or
+            missing index
+    """
+    if sort not in SORT_ORDERS:
+        raise ValueError(f"Unknown sort order '{sort}'")
+
+    conditions = []
+    params = []
+    if source:
+        conditions.append('j.source = ?')
+        params.append(source)
+    if company:
+        conditions.append('j.board_token = ?')
+        params.append(company)
+    if min_views:
+        conditions.append('j.viewed_count >= ?')
+        params.append(min_views)
+    if min_applications:
+        conditions.append('j.applied_count >= ?')
+        params.append(min_applications)
+
+    columns = ', '.join(f'j.{field}' for field in JOB_FIELDS)
+    if query:
+        order = SORT_ORDERS[sort]
+        sql = f'''
+            SELECT {columns}, bm25(jobs_fts, {', '.join(map(str, RANK_WEIGHTS))}) AS score,
+                   snippet(jobs_fts, 1, '[', ']', '...', 16) AS snippet
+            FROM jobs_fts JOIN jobs j ON j.doc = jobs_fts.rowid
+            WHERE jobs_fts MATCH ? {''.join(f' AND {condition}' for condition in conditions)}
+            ORDER BY {order} LIMIT ?
+        '''
+        params = [query] + params
+    else:
+        order = SORT_ORDERS['views' if sort == 'rank' else sort]
+        sql = f'''
+            SELECT {columns}, NULL AS score, substr(j.description, 1, 120) AS snippet
+            FROM jobs j {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY {order} LIMIT ?
+        '''
+
+    try:
+        rows = conn.execute(sql, params + [limit]).fetchall()
+    except sqlite3.OperationalError as e:
+        # A query SQLite cannot parse gets one retry with every word quoted;
+        # other errors (locked database, missing index) are not about the query
+        if not query or not any(part in str(e) for part in FTS_QUERY_ERRORS):
+            raise
+        if query == quote_terms(query):
+            raise ValueError(f"Invalid search query '{query}': {e}")
+        return search_jobs(conn, quote_terms(query), source=source, company=company, min_views=min_views,
+                           min_applications=min_applications, sort=sort, limit=limit)
+    return [dict(row) for row in rows]
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the search index"""
+    parser = argparse.ArgumentParser(description="Build and query a full-text index of scraped jobs")
+    parser.add_argument('--db', default='jobs_search.db', help="SQLite index file (default: jobs_search.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index = commands.add_parser('index', help="Add job files to the index")
+    index.add_argument('paths', nargs='+', help="JSON/NDJSON job files or directories of them")
+    index.add_argument('--workers', type=int, default=1,
+                       help="Processes used to clean descriptions (default: 1)")
+    index.add_argument('--force', action='store_true', help="Re-read files that look unchanged")
+    index.add_argument('--optimize', action='store_true', help="Merge index segments after indexing")
+
+    search = commands.add_parser('search', help="Search the index")
+    search.add_argument('query', nargs='?', help="Keywords or an FTS5 query (omit to only filter)")
+    search.add_argument('--source', help="Only jobs from this source")
+    search.add_argument('--company', help="Only jobs with this board token")
+    search.add_argument('--min-views', type=int, default=0, help="Minimum viewed count")
+    search.add_argument('--min-applications', type=int, default=0, help="Minimum applied count")
+    search.add_argument('--sort', choices=list(SORT_ORDERS), default='rank',
+                        help="Result order (default: rank)")
+    search.add_argument('--limit', type=int, default=20, help="Maximum number of results (default: 20)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    conn = open_search_index(args.db)
+
+    if args.command == 'index':
+        started = time.perf_counter()
+        totals = index_job_files(conn, args.paths, workers=args.workers, force=args.force)
+        if args.optimize:
+            optimize_index(conn)
+        print(f"Indexed {totals['jobs']} jobs from {totals['files']} file(s) "
+              f"({totals['skipped_files']} unchanged file(s) skipped) in {time.perf_counter() - started:.1f}s: "
+              f"{totals['new']} new, {totals['changed']} changed")
+    else:
+        started = time.perf_counter()
+        try:
+            results = search_jobs(conn, args.query, source=args.source, company=args.company,
+                                  min_views=args.min_views, min_applications=args.min_applications,
+                                  sort=args.sort, limit=args.limit)
+        except ValueError as e:
+            print(e)
+            raise SystemExit(2)
+        elapsed = (time.perf_counter() - started) * 1000
+        for result in results:
+            print(f"{result['title']} | {result['board_token']} ({result['source']}) | "
+                  f"{result['viewed_count']} views, {result['applied_count']} applications")
+            print(f"  {result['apply_url']}")
+            print(f"  {result['snippet']}")
+        print(f"{len(results)} result(s) in {elapsed:.1f} ms")
+    conn.close()
@@ -0,0 +1,276 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Durations kept per stage for percentiles (reservoir sample beyond this)
+MAX_SAMPLES = 10000
+
+class _StageStats:
+    """Count, total, max and a bounded sample of durations for one stage"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds, rng):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            index = rng.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = seconds
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def percentile(point):
+            if not ordered:
+                return None
+            return ordered[max(math.ceil(point / 100 * len(ordered)) - 1, 0)]
+
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else None,
+            'max_seconds': self.max,
+            'p50_seconds': percentile(50),
+            'p95_seconds': percentile(95),
+            'p99_seconds': percentile(99),
+        }
+
+class RunMetrics:
+    """
+    Thread-safe collector of stage timings, counters and per-page events
+
+    Stages are timed with the stage() context manager or add_time();
+    counters cover bytes transferred, retries and rows. The result is
+    exported as a JSON run report and, optionally, a Prometheus text file
+    (for node_exporter's textfile collector).
+
+    Args:
+        run (str): Name of the run, e.g. 'scrape' or 'convert'
+        labels (dict): Extra labels for the report and every Prometheus
+            sample, e.g. {'query': 'Data Scientist'} (optional)
+        max_events (int): Keep only this many of the most recent events, for
+            long-running processes (default: keep all)
+    """
+
+    def __init__(self, run, labels=None, max_events=None):
+        self.run = run
+        self.labels = dict(labels or {})
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._finished = None
+        self.stages = {}
+        self.counters = {}
+        self.events = deque(maxlen=max_events)
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds, calls=1):
+        """
+        Record time spent in a stage
+
+        Args:
+            name (str): Stage name
+            seconds (float): Time spent
+            calls (int): Number of calls the time covers; above 1 it is
+                recorded as that many calls of equal length (default: 1)
+        """
+        with self._lock:
+            stats = self.stages.setdefault(name, _StageStats())
+            if calls == 1:
+                stats.add(seconds, self._random)
+            elif calls > 1:
+                # Aggregated time from a worker: counted, but not sampled per call
+                stats.count += calls
+                stats.total += seconds
+                stats.max = max(stats.max, seconds / calls)
+
+    def increment(self, name, value=1):
+        """Add to a counter such as 'bytes_received', 'http_retries' or 'rows'"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_event(self, kind, **fields):
+        """Record one event, e.g. a page fetch with its duration and size"""
+        with self._lock:
+            self.events.append(dict(fields, kind=kind))
+
+    def finish(self):
+        """Stop the run clock; later report() calls use the same duration"""
+        if self._finished is None:
+            self._finished = time.perf_counter()
+
+    @property
+    def duration(self):
+        """Seconds since the run started (or until finish())"""
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    def report(self, slowest=10):
+        """
+        Build the run report
+
+        Args:
+            slowest (int): Number of slowest page fetches to list (default: 10)
+
+        Returns:
+            dict: Run name, labels, duration, stage statistics, counters,
+                rows per second and the slowest page fetches
+        """
+        with self._lock:
+            duration = self.duration
+            pages = [event for event in self.events if event['kind'] == 'page']
+            pages.sort(key=lambda event: event.get('seconds', 0), reverse=True)
+            rows = self.counters.get('rows', 0)
+            return {
+                'run': self.run,
+                'labels': self.labels,
+                'started_at': self.started_at,
+                'duration_seconds': duration,
+                'rows': rows,
+                'rows_per_second': rows / duration if duration > 0 else None,
+                'stages': {name: stats.summary() for name, stats in self.stages.items()},
+                'counters': dict(self.counters),
+                'slowest_pages': pages[:slowest],
+                'events': list(self.events),
+            }
+
+    def write_json(self, filename):
+        """Write the run report as JSON"""
+        _write_atomic(filename, json.dumps(self.report(), indent=2, default=str) + '\n')
+
+    def prometheus_text(self, prefix='hiring_cafe'):
+        """
+        Render the metrics in the Prometheus text exposition format
+
+        Args:
+            prefix (str): Metric name prefix (default: 'hiring_cafe')
+
+        Returns:
+            str: Metrics text
+        """
+        report = self.report()
+        base_labels = dict(self.labels, run=self.run)
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f'{prefix}_{name}{_format_labels(dict(base_labels, **labels))} {value}')
+
+        metric('run_duration_seconds', 'gauge', 'Wall-clock duration of the run',
+               [({}, report['duration_seconds'])])
+        metric('run_rows_per_second', 'gauge', 'Rows processed per second over the run',
+               [({}, report['rows_per_second'])])
+        stages = report['stages']
+        metric('stage_seconds_total', 'counter', 'Time spent in each stage',
+               [({'stage': name}, stats['total_seconds']) for name, stats in stages.items()])
+        metric('stage_calls_total', 'counter', 'Number of times each stage ran',
+               [({'stage': name}, stats['count']) for name, stats in stages.items()])
+        metric('stage_seconds_max', 'gauge', 'Longest single call of each stage',
+               [({'stage': name}, stats['max_seconds']) for name, stats in stages.items()])
+        metric('stage_seconds_p95', 'gauge', '95th percentile duration of each stage',
+               [({'stage': name}, stats['p95_seconds']) for name, stats in stages.items()])
+        for name, value in sorted(report['counters'].items()):
+            metric(f'{_metric_name(name)}_total', 'counter', f'Total {name.replace("_", " ")}', [({}, value)])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, filename, prefix='hiring_cafe'):
+        """Write the metrics as a Prometheus text file"""
+        _write_atomic(filename, self.prometheus_text(prefix))
+
+def timed(metrics, name):
+    """
+    Time a block as a stage of metrics, or do nothing when metrics is None
+
+    Args:
+        metrics (RunMetrics): Collector, or None when metrics are off
+        name (str): Stage name
+
+    Returns:
+        Context manager
+    """
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+def timed_iter(iterable, metrics, name):
+    """
+    Yield from an iterable, timing each step as a call of a stage
+
+    Args:
+        iterable (iterable): Source, e.g. jobs read from a file
+        metrics (RunMetrics): Collector
+        name (str): Stage name
+
+    Yields:
+        Items of the iterable
+    """
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        metrics.add_time(name, time.perf_counter() - started)
+        yield item
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = []
+    for name, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        escaped.append(f'{_metric_name(name)}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+def _write_atomic(filename, text):
+    # Scrapers of the file never see it half-written
+    temp_filename = f'{filename}.{os.getpid()}.tmp'
+    with open(temp_filename, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_filename, filename)
+
+def write_run_metrics(metrics, json_file=None, prometheus_file=None):
+    """
+    Finish a run and export its metrics to the requested files
+
+    Args:
+        metrics (RunMetrics): Collected metrics
+        json_file (str): Path for the JSON run report (optional)
+        prometheus_file (str): Path for the Prometheus text file (optional)
+    """
+    metrics.finish()
+    if json_file:
+        metrics.write_json(json_file)
+        print(f"Run report saved to {json_file}")
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
+        print(f"Prometheus metrics saved to {prometheus_file}")
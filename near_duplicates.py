@@ -0,0 +1,377 @@
+import argparse
+import html
+import re
+import zlib
+
+from excel_converter import default_output_prefix
+from job_io import iter_jobs_from_file, write_jobs_ndjson
+from parallel import iter_batch_results
+
+# Keys added to jobs by this stage
+DUPLICATE_KEYS = ('duplicate_of', 'duplicate_ids', 'duplicate_sources')
+
+DEDUPE_MODES = ('drop', 'flag')
+
+WORD_RE = re.compile(r'\w+')
+TAG_RE = re.compile(r'<[^>]*>')
+
+# Weight of missed near-duplicates against extra comparisons when choosing
+# the LSH banding; extra comparisons only cost time
+FALSE_NEGATIVE_WEIGHT = 0.8
+
+# Signature rows are stored in blocks of this many jobs
+_BLOCK_SIZE = 8192
+
+def _import_numpy():
+    """Import numpy lazily so the other scripts do not depend on it"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Near-duplicate detection requires the 'numpy' package (pip install numpy)")
+    return numpy
+
+def job_text(job):
+    """
+    Text a job is compared on: its title and description without markup
+
+    Tags are replaced by spaces with a regular expression rather than the
+    exact (and much slower) cleaning used for export; only the words matter
+    for fingerprinting.
+
+    Args:
+        job (dict): Job dictionary as returned by the API
+
+    Returns:
+        str: Lower-cased plain text
+    """
+    job_info = job.get('job_information') or {}
+    text = f"{job_info.get('title') or ''} {job_info.get('description') or ''}"
+    return html.unescape(TAG_RE.sub(' ', text)).lower()
+
+def lsh_parameters(num_perm, threshold):
+    """
+    Choose LSH banding for a similarity threshold
+
+    A pair whose Jaccard similarity is s shares at least one band with
+    probability 1 - (1 - s**rows)**bands. The banding is chosen to minimise
+    the weighted area of false positives (below the threshold) and false
+    negatives (above it); false negatives weigh more because candidates
+    are verified against the threshold anyway.
+
+    Args:
+        num_perm (int): Signature length
+        threshold (float): Target Jaccard similarity
+
+    Returns:
+        tuple: (bands, rows) with bands * rows <= num_perm
+    """
+    steps = 200
+
+    def collision(similarity, bands, rows):
+        return 1 - (1 - similarity ** rows) ** bands
+
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        false_positive = sum(collision(threshold * step / steps, bands, rows)
+                             for step in range(steps)) * threshold / steps
+        false_negative = sum(1 - collision(threshold + (1 - threshold) * step / steps, bands, rows)
+                             for step in range(steps)) * (1 - threshold) / steps
+        error = (1 - FALSE_NEGATIVE_WEIGHT) * false_positive + FALSE_NEGATIVE_WEIGHT * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles
+
+    Words are hashed once (and cached), shingles are combined from word
+    hashes and each of the num_perm hash functions is a multiply-shift
+    hash, all vectorized with numpy.
+
+    Args:
+        num_perm (int): Signature length (default: 64)
+        shingle_size (int): Words per shingle (default: 3)
+        seed (int): Seed for the hash functions (default: 1)
+    """
+
+    def __init__(self, num_perm=64, shingle_size=3, seed=1):
+        np = _import_numpy()
+        self.np = np
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers keep multiply-shift hashing universal
+        self.multipliers = (rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self.offsets = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self.shingle_weights = rng.integers(1, 2 ** 63, shingle_size, dtype=np.uint64) | np.uint64(1)
+        self._word_hashes = {}
+
+    def _hash_words(self, words):
+        cache = self._word_hashes
+        hashes = []
+        for word in words:
+            value = cache.get(word)
+            if value is None:
+                value = zlib.crc32(word.encode('utf-8'))
+                if len(cache) < 1_000_000:
+                    cache[word] = value
+            hashes.append(value)
+        return self.np.array(hashes, dtype=self.np.uint64)
+
+    def signature(self, text):
+        """
+        MinHash signature of a text
+
+        Args:
+            text (str): Plain text
+
+        Returns:
+            numpy.ndarray: num_perm uint32 values, or None if the text has no words
+        """
+        np = self.np
+        words = WORD_RE.findall(text)
+        if not words:
+            return None
+        word_hashes = self._hash_words(words)
+        size = min(self.shingle_size, len(word_hashes))
+        count = len(word_hashes) - size + 1
+        # uint64 arithmetic wraps around, which is what the hashes rely on
+        with np.errstate(over='ignore'):
+            shingles = np.zeros(count, dtype=np.uint64)
+            for position in range(size):
+                shingles += word_hashes[position:position + count] * self.shingle_weights[position]
+            shingles = np.unique(shingles)
+            hashed = self.multipliers[:, None] * shingles[None, :] + self.offsets[:, None]
+        return (hashed.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+class NearDuplicateIndex:
+    """
+    Streaming LSH index that groups near-duplicate signatures into clusters
+
+    Each band of a signature is looked up in its own bucket table, which
+    remembers only the first job that produced it, so every job is compared
+    with at most one earlier job per band. Pairs whose estimated Jaccard
+    similarity reaches the threshold are joined with union-find; the
+    earliest job of a cluster is its representative. Work and memory grow
+    linearly with the number of jobs.
+
+    Args:
+        threshold (float): Jaccard similarity at which two jobs are
+            near-duplicates (default: 0.8)
+        num_perm (int): Signature length (default: 64)
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64):
+        self.np = _import_numpy()
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_parameters(num_perm, threshold)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.parents = []
+        self._blocks = []
+        self.comparisons = 0
+
+    def _signature_of(self, index):
+        return self._blocks[index // _BLOCK_SIZE][index % _BLOCK_SIZE]
+
+    def _store(self, index, signature):
+        if index % _BLOCK_SIZE == 0:
+            self._blocks.append(self.np.zeros((_BLOCK_SIZE, self.num_perm), dtype=self.np.uint32))
+        if signature is not None:
+            self._blocks[-1][index % _BLOCK_SIZE] = signature
+
+    def find(self, index):
+        """Representative (earliest job) of the cluster containing index"""
+        parents = self.parents
+        root = index
+        while parents[root] != root:
+            root = parents[root]
+        while parents[index] != root:
+            parents[index], index = root, parents[index]
+        return root
+
+    def _union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # The earlier job stays the representative
+            if second < first:
+                first, second = second, first
+            self.parents[second] = first
+
+    def add(self, signature):
+        """
+        Add the next job's signature
+
+        Args:
+            signature (numpy.ndarray): MinHash signature, or None for a job
+                without text (never a duplicate)
+
+        Returns:
+            int: Index of the job
+        """
+        index = len(self.parents)
+        self.parents.append(index)
+        self._store(index, signature)
+        if signature is None:
+            return index
+
+        compared = set()
+        for band, buckets in enumerate(self.buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            other = buckets.setdefault(key, index)
+            if other == index or other in compared:
+                continue
+            compared.add(other)
+            self.comparisons += 1
+            similarity = self.np.count_nonzero(self._signature_of(other) == signature) / self.num_perm
+            if similarity >= self.threshold:
+                self._union(other, index)
+        return index
+
+    def representatives(self):
+        """List mapping every job index to its cluster representative"""
+        return [self.find(index) for index in range(len(self.parents))]
+
+# One MinHasher per worker process, created on first use
+_worker_hashers = {}
+
+def _signature_batch(texts, num_perm, shingle_size):
+    """Signatures of a batch of texts; module level so it can run in worker processes"""
+    key = (num_perm, shingle_size)
+    if key not in _worker_hashers:
+        _worker_hashers[key] = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+    hasher = _worker_hashers[key]
+    return [hasher.signature(text) for text in texts]
+
+def iter_signatures(jobs, num_perm=64, shingle_size=3, workers=1, batch_size=1000):
+    """
+    MinHash signatures of jobs in input order, optionally across processes
+
+    Args:
+        jobs (iterable): Job dictionaries
+        num_perm (int): Signature length (default: 64)
+        shingle_size (int): Words per shingle (default: 3)
+        workers (int): Worker processes (default: 1, no pool)
+        batch_size (int): Jobs sent to a worker at a time (default: 1000)
+
+    Yields:
+        numpy.ndarray: Signature of each job, or None for jobs without text
+    """
+    texts = (job_text(job) for job in jobs)
+    if workers <= 1:
+        hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        for text in texts:
+            yield hasher.signature(text)
+        return
+
+    for signatures in iter_batch_results(_signature_batch, texts, workers, batch_size, num_perm, shingle_size):
+        yield from signatures
+
+def find_near_duplicates(jobs, threshold=0.8, num_perm=64, shingle_size=3, workers=1):
+    """
+    Cluster near-duplicate jobs by the text of their title and description
+
+    Args:
+        jobs (iterable): Job dictionaries
+        threshold (float): Jaccard similarity of word shingles at which two
+            jobs are near-duplicates (default: 0.8)
+        num_perm (int): MinHash signature length (default: 64)
+        shingle_size (int): Words per shingle (default: 3)
+        workers (int): Processes used to compute signatures (default: 1)
+
+    Returns:
+        list: For every job in input order, the index of the first job of
+            its cluster (its own index if it has no earlier duplicate)
+    """
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm)
+    for signature in iter_signatures(jobs, num_perm=num_perm, shingle_size=shingle_size, workers=workers):
+        index.add(signature)
+    return index.representatives()
+
+def dedupe_job_file(input_file, output_file, mode='drop', threshold=0.8, num_perm=64, shingle_size=3,
+                    workers=1):
+    """
+    Find near-duplicate jobs in a file and write them merged or flagged
+
+    Reads the input twice: once to build the clusters, once to write the
+    output, so only signatures and ids are held in memory. In 'drop' mode only the
+    first job of each cluster is written, with 'duplicate_ids' and
+    'duplicate_sources' listing the jobs merged into it. In 'flag' mode
+    every job is written and duplicates get a 'duplicate_of' key naming
+    the representative's id.
+
+    Args:
+        input_file (str): JSON or NDJSON job file (optionally .gz/.zst)
+        output_file (str): NDJSON output file (optionally .gz/.zst)
+        mode (str): 'drop' or 'flag' (default: 'drop')
+        threshold (float): Jaccard similarity threshold (default: 0.8)
+        num_perm (int): MinHash signature length (default: 64)
+        shingle_size (int): Words per shingle (default: 3)
+        workers (int): Processes used to compute signatures (default: 1)
+
+    Returns:
+        dict: 'jobs', 'clusters' (with more than one job), 'duplicates'
+            and 'written' counts
+    """
+    if mode not in DEDUPE_MODES:
+        raise ValueError(f"Unknown dedupe mode '{mode}', expected 'drop' or 'flag'")
+
+    print(f"Fingerprinting jobs in {input_file}...")
+    ids = []
+    sources = []
+
+    def remembered(jobs):
+        for job in jobs:
+            ids.append(job.get('id'))
+            sources.append(job.get('source_and_board_token'))
+            yield job
+
+    representatives = find_near_duplicates(remembered(iter_jobs_from_file(input_file)), threshold=threshold,
+                                           num_perm=num_perm, shingle_size=shingle_size, workers=workers)
+    members = {}
+    for index, representative in enumerate(representatives):
+        if representative != index:
+            members.setdefault(representative, []).append(index)
+    duplicate_indexes = {index for indexes in members.values() for index in indexes}
+
+    def annotated():
+        for index, job in enumerate(iter_jobs_from_file(input_file)):
+            if index in members:
+                job['duplicate_ids'] = [ids[member] for member in members[index]]
+                job['duplicate_sources'] = sorted({sources[member] for member in members[index]
+                                                   if sources[member] is not None})
+            if index in duplicate_indexes:
+                if mode == 'drop':
+                    continue
+                job['duplicate_of'] = ids[representatives[index]]
+            yield job
+
+    written = write_jobs_ndjson(annotated(), output_file)
+    stats = {'jobs': len(representatives), 'clusters': len(members),
+             'duplicates': len(duplicate_indexes), 'written': written}
+    print(f"Found {stats['duplicates']} near-duplicate(s) in {stats['clusters']} cluster(s) "
+          f"among {stats['jobs']} jobs; wrote {written} jobs to {output_file}")
+    return stats
+
+def parse_args(argv=None):
+    """Parse command-line arguments for near-duplicate detection"""
+    parser = argparse.ArgumentParser(description="Merge or flag near-duplicate jobs before export")
+    parser.add_argument('json_file', help="JSON/NDJSON job file")
+    parser.add_argument('-o', '--output', help="NDJSON output file (default: <input>_deduped.ndjson)")
+    parser.add_argument('--mode', choices=DEDUPE_MODES, default='drop',
+                        help="drop: keep one job per cluster; flag: keep all and mark duplicates (default: drop)")
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help="Jaccard similarity of title+description shingles (default: 0.8)")
+    parser.add_argument('--num-perm', type=int, default=64, help="MinHash signature length (default: 64)")
+    parser.add_argument('--shingle-size', type=int, default=3, help="Words per shingle (default: 3)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to compute signatures (default: 1)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    output = args.output or f'{default_output_prefix(args.json_file)}_deduped.ndjson'
+    dedupe_job_file(args.json_file, output, mode=args.mode, threshold=args.threshold,
+                    num_perm=args.num_perm, shingle_size=args.shingle_size, workers=args.workers)
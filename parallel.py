@@ -0,0 +1,38 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Batches queued per worker, so workers stay busy without reading the whole input
+BATCHES_PER_WORKER = 2
+
+def iter_batch_results(function, items, workers, batch_size, *args):
+    """
+    Map a function over batches of items on a process pool, in input order
+
+    Items are read lazily and at most BATCHES_PER_WORKER batches per worker
+    are in flight, so memory does not depend on the input size. Each result
+    is yielded once it and every result before it are done.
+
+    Args:
+        function (callable): Picklable function called as function(batch, *args)
+        items (iterable): Items to split into batches
+        workers (int): Worker processes
+        batch_size (int): Items per batch
+        *args: Extra arguments passed to every call
+
+    Yields:
+        The return value of function for each batch, in input order
+    """
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        exhausted = False
+        while not exhausted or pending:
+            while not exhausted and len(pending) < workers * BATCHES_PER_WORKER:
+                batch = list(islice(items, batch_size))
+                if not batch:
+                    exhausted = True
+                    break
+                pending.append(executor.submit(function, batch, *args))
+            if pending:
+                yield pending.popleft().result()
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with a cache entry (validators and body type)
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+class ResponseCache:
+    """
+    On-disk cache of JSON API responses with TTL and size-based LRU eviction
+
+    Entries are keyed by a hash of the endpoint URL and the canonical JSON
+    payload. Each entry is a '<key>.body' file holding the response body and
+    a '<key>.json' file holding its metadata; the metadata file's
+    modification time records when the entry was last used.
+
+    Args:
+        directory (str): Directory for cache files, created if missing
+        ttl (float): Seconds an entry is served without contacting the
+            server (default: 3600)
+        max_bytes (int): Total body size kept before the least recently
+            used entries are evicted (default: 500 MB)
+    """
+
+    def __init__(self, directory, ttl=3600, max_bytes=500 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(url, payload):
+        """
+        Build the cache key for a request
+
+        Args:
+            url (str): Endpoint URL
+            payload: JSON-serializable request body
+
+        Returns:
+            str: Hex SHA-256 digest of the URL and canonical payload
+        """
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(f"{url}\n{canonical}".encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def get(self, key):
+        """
+        Load a cache entry and mark it as recently used
+
+        Args:
+            key (str): Cache key from make_key()
+
+        Returns:
+            dict: Entry with 'stored_at', 'headers', 'encoding' and 'body'
+                (bytes), or None if there is no usable entry
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """Return True if an entry is younger than the TTL"""
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def put(self, key, response):
+        """
+        Store a successful response and evict old entries if over the size limit
+
+        Args:
+            key (str): Cache key from make_key()
+            response (requests.Response): Response with status 200
+        """
+        meta_path, body_path = self._paths(key)
+        entry = {
+            'stored_at': time.time(),
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            'encoding': response.encoding,
+        }
+        # Write to temporary files first so readers never see a partial entry
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(body_path + suffix, 'wb') as f:
+            f.write(response.content)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+        self.evict()
+
+    def refresh(self, key):
+        """Reset the age of an entry after the server confirmed it is unchanged"""
+        meta_path, _ = self._paths(key)
+        entry = self.get(key)
+        if entry is None:
+            return None
+        entry['stored_at'] = time.time()
+        body = entry.pop('body')
+        temp_path = f'{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, meta_path)
+        entry['body'] = body
+        return entry
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        with self._lock:
+            entries = []
+            total_bytes = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                meta_path, body_path = self._paths(name[:-len('.json')])
+                try:
+                    last_used = os.path.getmtime(meta_path)
+                    size = os.path.getsize(body_path)
+                except OSError:
+                    continue
+                entries.append((last_used, meta_path, body_path, size))
+                total_bytes += size
+
+            entries.sort()
+            for _, meta_path, body_path, size in entries:
+                if total_bytes <= self.max_bytes:
+                    break
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total_bytes -= size
+
+def _response_from_entry(url, entry):
+    """Build a requests.Response from a cache entry"""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.encoding = entry.get('encoding')
+    response._content = entry['body']
+    response.from_cache = True
+    return response
+
+class CachedSession(requests.Session):
+    """
+    requests.Session that serves JSON POST requests from a ResponseCache
+
+    Fresh entries are returned without any network traffic. Stale entries
+    are revalidated with If-None-Match / If-Modified-Since when the server
+    sent an ETag or Last-Modified header, and a 304 reply is answered from
+    the cache.
+
+    Args:
+        cache (ResponseCache): Cache used for responses
+    """
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def post(self, url, data=None, json=None, **kwargs):
+        if json is None:
+            return super().post(url, data=data, **kwargs)
+
+        key = self.cache.make_key(url, json)
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            return _response_from_entry(url, entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if 'ETag' in entry['headers']:
+                headers['If-None-Match'] = entry['headers']['ETag']
+            if 'Last-Modified' in entry['headers']:
+                headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+        response = super().post(url, data=data, json=json, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            entry = self.cache.refresh(key) or entry
+            return _response_from_entry(url, entry)
+        if response.status_code == 200:
+            self.cache.put(key, response)
+        response.from_cache = False
+        return response
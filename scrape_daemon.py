@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from job_index import job_content_hash
+from job_io import write_jobs_ndjson
+from job_scraper import build_search_state, create_session, iter_job_pages, iter_unique_jobs, load_queries
+from metrics import RunMetrics
+
+# Longest wait before a failed refresh is tried again (it never waits longer than its interval)
+MAX_RETRY_DELAY = 900
+
+# Page events kept in the daemon's metrics (older ones are dropped)
+DAEMON_MAX_EVENTS = 1000
+
+class ScheduledQuery:
+    """
+    A search query refreshed on a fixed interval
+
+    Args:
+        query (str): Search term
+        interval (float): Seconds between the starts of two refreshes
+        priority (int): Higher runs first when several queries are due (default: 0)
+    """
+
+    def __init__(self, query, interval, priority=0):
+        self.query = query
+        self.interval = interval
+        self.priority = priority
+        self.next_run = 0.0
+        self.failures = 0
+        self.last_jobs = None
+
+def load_schedule(filename, interval=3600, priority=0):
+    """
+    Load the queries to refresh
+
+    A .json file holds a list of objects with a 'query' and optional
+    'interval' (seconds) and 'priority'; any other file is read with
+    load_queries(), one query per line, using the default interval and
+    priority.
+
+    Args:
+        filename (str): Schedule file
+        interval (float): Default refresh interval in seconds (default: 3600)
+        priority (int): Default priority (default: 0)
+
+    Returns:
+        list: ScheduledQuery objects in file order
+    """
+    if not filename.endswith('.json'):
+        return [ScheduledQuery(query, interval, priority) for query in load_queries(filename)]
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return [ScheduledQuery(entry['query'], float(entry.get('interval', interval)), int(entry.get('priority', priority)))
+            for entry in entries]
+
+def _slug(query):
+    return query.lower().replace(' ', '_').replace(os.sep, '_')
+
+class JsonSnapshotSink:
+    """
+    Sink that keeps the latest result of every query as <query>_jobs.json
+
+    Each refresh replaces the query's file atomically, in the same format
+    as job_scraper.py's JSON output.
+
+    Args:
+        directory (str): Output directory, created if missing
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, query, jobs):
+        filename = os.path.join(self.directory, f'{_slug(query)}_jobs.json')
+        temp_filename = f'{filename}.tmp'
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(jobs, f, indent=2, ensure_ascii=False)
+        os.replace(temp_filename, filename)
+
+    def close(self):
+        pass
+
+class NdjsonSink:
+    """
+    Sink that appends every refresh to one NDJSON file
+
+    Jobs get a 'matched_queries' list naming the query, as in batch mode,
+    and a 'scraped_at' timestamp.
+
+    Args:
+        filename (str): Output file (.gz/.zst are compressed; compressed
+            files gain one stream per refresh, which readers handle)
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+
+    def write(self, query, jobs):
+        scraped_at = time.time()
+        with self._lock:
+            write_jobs_ndjson((dict(job, matched_queries=[query], scraped_at=scraped_at) for job in jobs),
+                              self.filename, append=True)
+
+    def close(self):
+        pass
+
+class SqliteSink:
+    """
+    Sink that keeps the current jobs of every query in a SQLite table
+
+    Rows are keyed by (query, id) and hold the job JSON with when it was
+    first and last seen; a job is only rewritten when its content changes.
+    The daemon only writes complete refreshes, so jobs of the query that
+    the refresh did not return are deleted.
+
+    Args:
+        filename (str): SQLite database file, created if missing
+    """
+
+    def __init__(self, filename):
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS scraped_jobs (
+                query TEXT NOT NULL,
+                id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                job TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (query, id)
+            )
+        ''')
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    def write(self, query, jobs):
+        seen_at = time.time()
+        rows = [(query, str(job.get('id', '')), job_content_hash(job), json.dumps(job, ensure_ascii=False),
+                 seen_at, seen_at) for job in jobs if isinstance(job, dict)]
+        with self._lock:
+            self.conn.executemany('''
+                INSERT INTO scraped_jobs (query, id, content_hash, job, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (query, id) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    job = CASE WHEN content_hash = excluded.content_hash THEN job ELSE excluded.job END,
+                    content_hash = excluded.content_hash
+            ''', rows)
+            # Jobs that have left the query's results
+            self.conn.execute('DELETE FROM scraped_jobs WHERE query = ? AND last_seen < ?', (query, seen_at))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+# Sink types for open_sink(), by the prefix of their spec
+SINKS = {'json': JsonSnapshotSink, 'ndjson': NdjsonSink, 'sqlite': SqliteSink}
+
+def open_sink(spec):
+    """
+    Create a sink from a 'type:target' spec
+
+    Any object with write(query, jobs) and close() methods can be passed to
+    ScrapeDaemon instead; write() is called from worker threads.
+
+    Args:
+        spec (str): 'json:<directory>', 'ndjson:<file>' or 'sqlite:<file>'
+
+    Returns:
+        Sink object
+
+    Raises:
+        ValueError: If the sink type is unknown
+    """
+    kind, _, target = spec.partition(':')
+    if kind not in SINKS or not target:
+        raise ValueError(f"Unknown sink '{spec}'; use one of {', '.join(f'{name}:<path>' for name in SINKS)}")
+    return SINKS[kind](target)
+
+class ScrapeDaemon:
+    """
+    Long-running scheduler that keeps a set of queries refreshed
+
+    Queries wait in a priority queue ordered by their next due time. When
+    several are due, the highest priority runs first. At most
+    max_concurrent refreshes run at once, on worker threads that share one
+    session. Its keep-alive connection pool and token bucket (the global
+    request budget) therefore outlive individual refreshes, and requests
+    are paced evenly instead of arriving in bursts. A failed refresh is
+    retried with exponential backoff, never later than its next regular run.
+
+    Args:
+        session (requests.Session): Session from job_scraper.create_session()
+        sink: Object with write(query, jobs) and close(), e.g. from open_sink()
+        max_concurrent (int): Refreshes running at the same time (default: 2)
+        concurrency (int): Pages fetched in parallel per refresh (default: 1)
+        metrics_file (str): Rewrite the session's metrics in Prometheus text
+            format to this file after every refresh (optional)
+    """
+
+    def __init__(self, session, sink, max_concurrent=2, concurrency=1, metrics_file=None):
+        self.session = session
+        self.sink = sink
+        self.max_concurrent = max_concurrent
+        self.concurrency = concurrency
+        self.metrics_file = metrics_file
+        self._base_state = build_search_state("")
+        self._queue = []
+        self._counter = itertools.count()
+        self._stopping = None
+
+    def add_query(self, scheduled, run_at=None):
+        """
+        Schedule a query
+
+        Args:
+            scheduled (ScheduledQuery): Query to keep refreshed
+            run_at (float): time.monotonic() of the first refresh (default: now)
+        """
+        scheduled.next_run = time.monotonic() if run_at is None else run_at
+        heapq.heappush(self._queue, (scheduled.next_run, -scheduled.priority, next(self._counter), scheduled))
+
+    def stop(self):
+        """Stop starting refreshes; running ones are finished first"""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def _pop_due(self, now):
+        """Remove the highest-priority query among those that are due"""
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue))
+        if not due:
+            return None
+        due.sort(key=lambda entry: (entry[1], entry[0], entry[2]))
+        for entry in due[1:]:
+            heapq.heappush(self._queue, entry)
+        return due[0][3]
+
+    def refresh(self, scheduled):
+        """
+        Scrape one query and write its jobs to the sink (runs in a worker thread)
+
+        Returns:
+            int: Number of jobs written
+
+        Raises:
+            requests.exceptions.RequestException: If a request failed
+                after retries, or some pages could not be fetched
+        """
+        search_state = dict(self._base_state, searchQuery=scheduled.query)
+        failed_pages = []
+        seen_ids = set()
+        jobs = []
+        for current_batch in iter_job_pages(self.session, search_state, self.concurrency, failed_pages):
+            jobs.extend(iter_unique_jobs(current_batch, seen_ids))
+        if failed_pages:
+            raise requests.exceptions.RequestException(f"page(s) {failed_pages} failed after retries")
+        self.sink.write(scheduled.query, jobs)
+        return len(jobs)
+
+    async def _run_one(self, loop, executor, scheduled):
+        started = time.monotonic()
+        try:
+            count = await loop.run_in_executor(executor, self.refresh, scheduled)
+        except Exception as e:
+            # Sink and parsing errors are retried like request errors, so
+            # the query never drops out of the schedule
+            scheduled.failures += 1
+            delay = min(scheduled.interval, MAX_RETRY_DELAY, 30 * 2 ** (scheduled.failures - 1))
+            print(f"Refresh of '{scheduled.query}' failed ({e}); retrying in {delay:.0f}s")
+            self.add_query(scheduled, time.monotonic() + delay)
+            return
+
+        scheduled.failures = 0
+        scheduled.last_jobs = count
+        elapsed = time.monotonic() - started
+        print(f"Refreshed '{scheduled.query}': {count} jobs in {elapsed:.1f}s, "
+              f"next in {max(scheduled.interval - elapsed, 0):.0f}s")
+        self.add_query(scheduled, max(started + scheduled.interval, time.monotonic()))
+        metrics = getattr(self.session, 'metrics', None)
+        if self.metrics_file and metrics is not None:
+            metrics.write_prometheus(self.metrics_file)
+
+    async def run(self, once=False):
+        """
+        Refresh queries until stop() is called
+
+        Args:
+            once (bool): Refresh every scheduled query once and return
+                (default: False)
+        """
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        running = set()
+        remaining = len(self._queue) if once else None
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+            while not self._stopping.is_set():
+                if once and remaining == 0 and not running:
+                    break
+                scheduled = None
+                if len(running) < self.max_concurrent and (not once or remaining):
+                    scheduled = self._pop_due(time.monotonic())
+                if scheduled is not None:
+                    if once:
+                        remaining -= 1
+                    task = loop.create_task(self._run_one(loop, executor, scheduled))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    continue
+
+                # Sleep until the next query is due, a refresh finishes or stop() is called
+                timeout = None
+                if self._queue and len(running) < self.max_concurrent and (not once or remaining):
+                    timeout = max(self._queue[0][0] - time.monotonic(), 0)
+                waiters = set(running) | {loop.create_task(self._stopping.wait())}
+                done, pending = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in pending - running:
+                    waiter.cancel()
+
+            if running:
+                print(f"Waiting for {len(running)} running refresh(es) to finish...")
+                await asyncio.gather(*running)
+
+def parse_args(argv=None):
+    """Parse command-line arguments for the scraper daemon"""
+    parser = argparse.ArgumentParser(description="Keep hiring.cafe queries refreshed on a schedule")
+    parser.add_argument('schedule', help="Queries file: one query per line, or a .json list of "
+                                         "{\"query\", \"interval\", \"priority\"} objects")
+    parser.add_argument('--sink', default='ndjson:daemon_jobs.ndjson',
+                        help="Where results go: json:<directory>, ndjson:<file> or sqlite:<file> "
+                             "(default: ndjson:daemon_jobs.ndjson)")
+    parser.add_argument('--interval', type=float, default=3600,
+                        help="Default seconds between refreshes of a query (default: 3600)")
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help="Global request budget in requests per second (default: 1)")
+    parser.add_argument('--max-concurrent', type=int, default=2,
+                        help="Queries refreshed at the same time (default: 2)")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="Pages fetched in parallel per query (default: 1)")
+    parser.add_argument('--retries', type=int, default=3,
+                        help="Retries per request on 429/5xx and connection errors (default: 3)")
+    parser.add_argument('--once', action='store_true', help="Refresh every query once and exit")
+    parser.add_argument('--metrics-prom', help="Keep run metrics in Prometheus text format in this file")
+    return parser.parse_args(argv)
+
+async def main(args, sink):
+    """Run the daemon until SIGINT/SIGTERM (or after one pass with --once)"""
+    schedule = load_schedule(args.schedule, interval=args.interval)
+    # Page events are only kept for the recent past; the daemon never finishes
+    metrics = RunMetrics('daemon', max_events=DAEMON_MAX_EVENTS) if args.metrics_prom else None
+    session = create_session(pool_size=max(args.max_concurrent * args.concurrency, 1),
+                             requests_per_second=args.rate, retries=args.retries, metrics=metrics)
+    daemon = ScrapeDaemon(session, sink, max_concurrent=args.max_concurrent, concurrency=args.concurrency,
+                          metrics_file=args.metrics_prom)
+    for scheduled in schedule:
+        daemon.add_query(scheduled)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, daemon.stop)
+        except NotImplementedError:
+            # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+
+    print(f"Refreshing {len(schedule)} queries into {args.sink} at up to {args.rate:g} requests/s")
+    try:
+        await daemon.run(once=args.once)
+    finally:
+        sink.close()
+        session.close()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        sink = open_sink(args.sink)
+    except ValueError as e:
+        print(e)
+        raise SystemExit(2)
+    try:
+        asyncio.run(main(args, sink))
+    except KeyboardInterrupt:
+        pass
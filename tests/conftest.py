@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(REPO_DIR, 'benchmarks')
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from mock_server import MockHiringCafe
+
+@pytest.fixture
+def mock_api():
+    """Start mock API servers in this process; returns a factory of base URLs"""
+    servers = []
+
+    def start(total=3500, **options):
+        server = MockHiringCafe(total, **options).serve()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def run_script(tmp_path):
+    """Run a repo script against a mock API in tmp_path; returns the finished process"""
+    def run(script, base_url, *args):
+        env = dict(os.environ, HIRING_CAFE_BASE_URL=base_url)
+        return subprocess.run([sys.executable, os.path.join(REPO_DIR, script), *args], cwd=tmp_path, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=120)
+    return run
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from job_io import iter_jobs_from_file
+
+# 3500 jobs are four pages of PAGE_SIZE; page 2 fails for good in the failure runs
+TOTAL = 3500
+FAILED_PAGE = 2
+
+def job_ids(filename):
+    return [job['id'] for job in iter_jobs_from_file(str(filename))]
+
+def test_complete_scrape_exits_0(mock_api, run_script, tmp_path):
+    result = run_script('job_scraper.py', mock_api(TOTAL), 'engineer', '-o', 'jobs.json')
+    assert result.returncode == 0, result.stdout
+    assert len(set(job_ids(tmp_path / 'jobs.json'))) == TOTAL
+
+def test_no_jobs_exits_1(mock_api, run_script):
+    result = run_script('job_scraper.py', mock_api(0), 'engineer', '-o', 'jobs.json')
+    assert result.returncode == 1, result.stdout
+
+@pytest.mark.parametrize('args', [
+    ['-o', 'jobs.json'],
+    ['-o', 'jobs.json', '--concurrency', '3'],
+    ['-o', 'jobs.ndjson'],
+    ['-o', 'jobs.ndjson', '--concurrency', '3'],
+    ['-o', 'jobs.json', '--shard'],
+    ['-o', 'jobs.ndjson', '--shard'],
+    ['-o', 'jobs.ndjson', '--checkpoint', 'jobs.checkpoint.json'],
+    ['-o', 'delta.ndjson', '--index', 'jobs.db'],
+], ids=lambda args: ' '.join(args))
+def test_failed_pages_exit_1(mock_api, run_script, args):
+    base_url = mock_api(TOTAL, fail_pages=[FAILED_PAGE])
+    result = run_script('job_scraper.py', base_url, 'engineer', '--retries', '0', *args)
+    assert result.returncode == 1, result.stdout
+    assert 'failed' in result.stdout or 'incomplete' in result.stdout
+
+def test_failed_pages_in_batch_mode_exit_1(mock_api, run_script, tmp_path):
+    (tmp_path / 'queries.txt').write_text('engineer\ndesigner\n')
+    base_url = mock_api(TOTAL, fail_pages=[FAILED_PAGE])
+    result = run_script('job_scraper.py', base_url, '--queries-file', 'queries.txt', '--retries', '0',
+                        '-o', 'jobs.json')
+    assert result.returncode == 1, result.stdout
+
+def test_failed_pages_in_cli_both_exit_1(mock_api, run_script):
+    base_url = mock_api(TOTAL, fail_pages=[FAILED_PAGE])
+    result = run_script('cli.py', base_url, 'both', 'engineer', '--retries', '0', '--output-prefix', 'jobs')
+    assert result.returncode == 1, result.stdout
+
+def test_resume_completes_after_failure(mock_api, run_script, tmp_path):
+    failing_url = mock_api(TOTAL, fail_pages=[FAILED_PAGE])
+    result = run_script('job_scraper.py', failing_url, 'engineer', '--retries', '0', '-o', 'jobs.ndjson',
+                        '--checkpoint', 'jobs.checkpoint.json')
+    assert result.returncode == 1, result.stdout
+
+    # A crash in the middle of a page leaves a partial line that resuming must drop
+    with open(tmp_path / 'jobs.ndjson', 'a', encoding='utf-8') as f:
+        f.write('{"id": "partial", "job_inf')
+
+    result = run_script('job_scraper.py', mock_api(TOTAL), 'engineer', '-o', 'jobs.ndjson', '--resume')
+    assert result.returncode == 0, result.stdout
+    ids = job_ids(tmp_path / 'jobs.ndjson')
+    assert len(ids) == len(set(ids)) == TOTAL
+
+def test_incomplete_index_run_reports_no_removed_jobs(mock_api, run_script, tmp_path):
+    result = run_script('job_scraper.py', mock_api(TOTAL), 'engineer', '-o', 'first.ndjson', '--index', 'jobs.db')
+    assert result.returncode == 0, result.stdout
+
+    base_url = mock_api(TOTAL, fail_pages=[FAILED_PAGE])
+    result = run_script('job_scraper.py', base_url, 'engineer', '--retries', '0', '-o', 'second.ndjson',
+                        '--index', 'jobs.db', '--concurrency', '3')
+    assert result.returncode == 1, result.stdout
+    with open(tmp_path / 'second.ndjson', encoding='utf-8') as f:
+        assert not [line for line in f if json.loads(line)['change_type'] == 'removed']
+
+def test_plan_shards_covers_the_query(mock_api, monkeypatch):
+    import job_scraper
+
+    base_url = mock_api(5000)
+    monkeypatch.setattr(job_scraper, 'COUNT_ENDPOINT', f"{base_url}/api/search-jobs/get-total-count")
+    monkeypatch.setattr(job_scraper, 'JOBS_ENDPOINT', f"{base_url}/api/search-jobs")
+    session = job_scraper.create_session(retries=0)
+
+    shards = job_scraper.plan_shards(session, job_scraper.build_search_state('engineer'), max_results=1000)
+    assert len(shards) > 1
+    assert all(total <= 1000 for _, total in shards)
+    assert sum(total for _, total in shards) == 5000
+
+    ids = set()
+    for shard_state, total in shards:
+        ids.update(job['id'] for job in job_scraper.scrape_with_session(session, shard_state, 2, total))
+    assert len(ids) == 5000
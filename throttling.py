@@ -0,0 +1,203 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that paces requests to a steady rate
+
+    Args:
+        rate (float): Tokens added per second
+        capacity (float): Largest burst allowed (default: one second's worth)
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit on requests in flight that adapts with AIMD
+
+    Every successful response raises the limit additively (by 1/limit, so
+    about +1 per round of requests); every throttled or failed response
+    halves it. Use as a context manager around each request.
+
+    Args:
+        max_limit (int): Highest number of requests in flight
+        min_limit (int): Lowest number of requests in flight (default: 1)
+    """
+
+    def __init__(self, max_limit, min_limit=1):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """Additive increase after a successful response"""
+        with self._condition:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self):
+        """Multiplicative decrease after a 429/5xx or connection error"""
+        with self._condition:
+            self.limit = max(self.min_limit, self.limit / 2)
+
+def retry_after_seconds(response):
+    """
+    Read the Retry-After header of a response
+
+    Args:
+        response (requests.Response): Response to inspect
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, backoff_base=0.5, backoff_max=30):
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt (int): Zero-based retry number
+        backoff_base (float): Delay ceiling for the first retry in seconds
+        backoff_max (float): Largest delay ceiling in seconds
+
+    Returns:
+        float: Random delay between 0 and min(backoff_max, base * 2**attempt)
+    """
+    return random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+
+class ThrottledAdapter(HTTPAdapter):
+    """
+    HTTP adapter that paces, limits and retries every request it sends
+
+    Requests wait for a token from the rate limiter and a slot from the
+    adaptive concurrency limiter. Connection errors, timeouts and
+    429/5xx responses are retried with jittered exponential backoff,
+    honouring Retry-After when the server sends it.
+
+    Args:
+        rate_limiter (TokenBucket): Paces requests (optional)
+        concurrency_limiter (AdaptiveConcurrencyLimiter): Bounds requests in
+            flight (optional)
+        retries (int): Retries per request after the first attempt (default: 3)
+        backoff_base (float): Backoff ceiling for the first retry (default: 0.5)
+        backoff_max (float): Largest backoff ceiling (default: 30)
+        max_retry_after (float): Longest Retry-After honoured (default: 300)
+        metrics (RunMetrics): Counts requests and retries (optional)
+        **kwargs: Passed to HTTPAdapter (pool_connections, pool_maxsize)
+    """
+
+    def __init__(self, rate_limiter=None, concurrency_limiter=None, retries=3,
+                 backoff_base=0.5, backoff_max=30, max_retry_after=300, metrics=None, **kwargs):
+        super().__init__(**kwargs)
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.metrics = metrics
+        self.retry_count = 0
+        self._count_lock = threading.Lock()
+
+    def _send_once(self, request, **kwargs):
+        if self.metrics is not None:
+            self.metrics.increment('http_requests')
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.concurrency_limiter is None:
+            return super().send(request, **kwargs)
+        with self.concurrency_limiter:
+            return super().send(request, **kwargs)
+
+    def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            response = None
+            error = None
+            try:
+                response = self._send_once(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                if self.concurrency_limiter is not None:
+                    self.concurrency_limiter.on_success()
+                return response
+
+            if self.concurrency_limiter is not None:
+                self.concurrency_limiter.on_throttle()
+
+            if attempt >= self.retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            else:
+                delay = min(delay, self.max_retry_after)
+
+            reason = error if error is not None else f"status {response.status_code}"
+            print(f"Retrying {request.url} in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{self.retries}) after {reason}")
+            if response is not None:
+                response.close()
+            with self._count_lock:
+                self.retry_count += 1
+            if self.metrics is not None:
+                self.metrics.increment('http_retries')
+            time.sleep(delay)
+            attempt += 1